@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""End-to-end benchmark of the multi-account commands against a fake MeroShare.
+
+Runs apply, sync, status, stats and `portfolio all` on AutomatedNepseUtils
+with 1, 10, 50 and 200 fake accounts (see fake_meroshare.py) and reports how
+long each command took and how many MeroShare requests it made. No network
+access or MeroShare config is needed.
+
+Usage: python benchmarks/commands.py [--accounts 1 10 50 200] [--commands apply sync ...]
+                                     [--latency S] [--error-rate R] [--runs N] [--seed N]
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import main as app  # noqa: E402
+from fake_meroshare import OPEN_ISSUES, FakeMeroShare  # noqa: E402
+
+COMMANDS = {
+    "apply": ("do_apply", ""),
+    "sync": ("do_sync", ""),
+    "status": ("do_status", " ".join(str(issue["companyShareId"]) for issue in OPEN_ISSUES)),
+    "stats": ("do_stats", ""),
+    "portfolio": ("do_portfolio", "all"),
+}
+
+
+def make_cli(state_dir, accounts, latency, error_rate, seed):
+    """AutomatedNepseUtils wired to a fake MeroShare, keeping its files in state_dir"""
+    cli = app.AutomatedNepseUtils()
+    for attr in (
+        "previously_applied_file",
+        "legacy_previously_applied_file",
+        "sync_state_file",
+        "cache_file",
+        "call_log_file",
+        "application_journal_file",
+    ):
+        setattr(cli, attr, os.path.join(state_dir, os.path.basename(getattr(cli, attr))))
+
+    # do_apply ends the run with a popup and os._exit
+    cli.final_popup_and_exit = lambda: None
+
+    cli.ms = FakeMeroShare(accounts, latency, error_rate, seed)
+    cli.make_saves_thread_safe()
+    for account in cli.ms.accounts:
+        cli.call_log.instrument(account)
+
+    return cli
+
+
+def run_command(command, accounts, latency, error_rate, seed):
+    """Time one command on a fresh client, returning (seconds, requests made)"""
+    method, args = COMMANDS[command]
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        cli = make_cli(state_dir, accounts, latency, error_rate, seed)
+
+        if command == "status":
+            # Give every account a form to look up for each open issue
+            for account in cli.ms.accounts:
+                for issue in OPEN_ISSUES:
+                    cli.ms.server.add_application(account, issue["companyShareId"])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            getattr(cli, method)(args)
+            elapsed = time.perf_counter() - started
+            cli.do_exit()
+
+        if cli._cache is not None:
+            cli.cache.connection.close()
+
+        return elapsed, cli.ms.server.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-account commands against a fake MeroShare")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[1, 10, 50, 200], help="Account counts to run")
+    parser.add_argument("--commands", nargs="+", choices=list(COMMANDS), default=list(COMMANDS), help="Commands to time")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds every fake request takes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake requests that fail")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per command and account count")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the simulated failures")
+    args = parser.parse_args()
+
+    # Failed requests are logged as warnings, which would drown the table
+    logging.disable(logging.CRITICAL)
+
+    print(f"Latency: {args.latency * 1000:.0f} ms, error rate: {args.error_rate:.0%}, runs: {args.runs}\n")
+    print(f"{'Command':<10} {'Accounts':>8} {'Median':>10} {'Min':>10} {'Requests':>9} {'Per account':>12}")
+
+    for command in args.commands:
+        for accounts in args.accounts:
+            timings = []
+            for run in range(args.runs):
+                elapsed, requests_made = run_command(
+                    command, accounts, args.latency, args.error_rate, args.seed + run
+                )
+                timings.append(elapsed)
+
+            median = statistics.median(timings)
+            print(
+                f"{command:<10} {accounts:>8} {median * 1000:>8.0f}ms {min(timings) * 1000:>8.0f}ms"
+                f" {requests_made:>9} {median / accounts * 1000:>10.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
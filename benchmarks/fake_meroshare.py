@@ -0,0 +1,281 @@
+#!/usr/bin/python3
+"""In-process stand-in for MeroShare, for benchmarking without network.
+
+FakeMeroShare and FakeAccount expose the parts of nepseutils' MeroShare and
+Account that main.py uses. Every call that would reach MeroShare sleeps for
+the configured latency and fails with the configured error rate instead, so
+the concurrency of AutomatedNepseUtils can be timed on any machine.
+"""
+
+import random
+import threading
+import time
+
+from nepseutils.core.errors import GlobalError, LocalException
+from nepseutils.core.issue import Issue
+from nepseutils.core.portfolio import Portfolio, PortfolioEntry
+
+# Issues open for application, as returned by applicableIssue
+OPEN_ISSUES = [
+    {
+        "companyShareId": 9001,
+        "companyName": "Himal Hydropower Limited",
+        "scrip": "HIMAL",
+        "shareTypeName": "IPO",
+        "shareGroupName": "Ordinary Shares",
+        "issueCloseDate": "2026-10-25",
+    },
+    {
+        "companyShareId": 9002,
+        "companyName": "Sagar Laghubitta Bittiya Sanstha Limited",
+        "scrip": "SAGAR",
+        "shareTypeName": "IPO",
+        "shareGroupName": "Ordinary Shares",
+        "issueCloseDate": "2026-10-27",
+    },
+    {
+        "companyShareId": 9003,
+        "companyName": "Nepal Mutual Fund",
+        "scrip": "NMF",
+        "shareTypeName": "IPO",
+        "shareGroupName": "Mutual Fund",
+        "issueCloseDate": "2026-10-29",
+    },
+]
+
+OPEN_SHARE_IDS = {issue["companyShareId"] for issue in OPEN_ISSUES}
+
+# Closed issues every account has applied for, results out for all but the last
+CLOSED_ISSUES = [(8000 + i, f"SCRIP{i}", f"Company {i}") for i in range(30)]
+
+HOLDINGS = [(f"SCRIP{i}", 10 * (i % 5 + 1), 200.0 + 15 * i) for i in range(0, 30, 3)]
+
+
+class FakeServer:
+    """Shared latency, error rate and application records of the fake accounts"""
+
+    def __init__(self, latency=0.05, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.applications = {}
+        self.requests = 0
+
+    def request(self, endpoint, account, can_fail=True):
+        """Simulate a single round trip to MeroShare"""
+        with self.lock:
+            self.requests += 1
+            failed = can_fail and self.random.random() < self.error_rate
+
+        time.sleep(self.latency)
+
+        if failed:
+            raise LocalException(f"Simulated {endpoint} failure for user {account.name}!")
+
+    def applied(self, account):
+        with self.lock:
+            return set(self.applications.get(account.dmat, ()))
+
+    def add_application(self, account, share_id):
+        with self.lock:
+            self.applications.setdefault(account.dmat, set()).add(share_id)
+
+
+class FakeAccount:
+    """Account backed by a FakeServer instead of MeroShare"""
+
+    def __init__(self, server, index, tag=None):
+        self.server = server
+        self.index = index
+        self.name = f"Account {index}"
+        self.dmat = f"1301{index:012d}"
+        self.tag = tag
+        self.auth_token = None
+        self.portfolio = Portfolio([], 0, 0, 0)
+        self.save = lambda: None
+
+        self.issues = []
+        for position, (share_id, symbol, name) in enumerate(CLOSED_ISSUES):
+            result_out = position < len(CLOSED_ISSUES) - 1
+            alloted = result_out and (index + position) % 4 == 0
+            self.issues.append(
+                Issue(
+                    name=name,
+                    symbol=symbol,
+                    status="TRANSACTION_SUCCESS",
+                    share_type="IPO",
+                    company_share_id=share_id,
+                    applicant_form_id=share_id * 1000 + index,
+                    alloted=alloted if result_out else None,
+                    alloted_quantity=10 if alloted else None,
+                    applied_date=f"2025-{position % 12 + 1:02d}-{position % 28 + 1:02d}",
+                    applied_quantity=10,
+                    applied_amount=1000.0,
+                    old=False,
+                )
+            )
+
+    def login(self):
+        self.server.request("login", self, can_fail=False)
+        self.auth_token = f"token-{self.dmat}"
+        return self.auth_token
+
+    def logout(self):
+        self.server.request("logout", self, can_fail=False)
+        self.auth_token = None
+        return True
+
+    def get_details(self):
+        self.server.request("get_details", self)
+        return {"name": self.name, "demat": self.dmat}
+
+    def fetch_applicable_issues(self):
+        self.server.request("fetch_applicable_issues", self)
+        applied = self.server.applied(self)
+        issues = [dict(issue) for issue in OPEN_ISSUES]
+        for issue in issues:
+            if issue["companyShareId"] in applied:
+                issue["action"] = "edit"
+        return issues
+
+    def apply(self, share_id, quantity):
+        issue_to_apply = None
+        for issue in self.fetch_applicable_issues():
+            if issue.get("companyShareId") == share_id:
+                issue_to_apply = issue
+
+        if not issue_to_apply:
+            raise GlobalError("No matching applicable issues!")
+
+        if issue_to_apply.get("action"):
+            return {"status": "CREATED", "message": "Issue already applied!"}
+
+        self.server.request("apply", self)
+        self.server.add_application(self, share_id)
+
+        self.fetch_applied_issues()
+        return {"status": "CREATED", "message": "Share has been applied successfully."}
+
+    def fetch_application_reports(self, active=True):
+        self.server.request("fetch_application_reports", self)
+        reports = [
+            {
+                "companyShareId": issue["companyShareId"],
+                "companyName": issue["companyName"],
+                "scrip": issue["scrip"],
+                "shareTypeName": issue["shareTypeName"],
+                "statusName": "TRANSACTION_SUCCESS",
+                "applicantFormId": issue["companyShareId"] * 1000 + self.index,
+            }
+            for issue in OPEN_ISSUES
+            if issue["companyShareId"] in self.server.applied(self)
+        ]
+        if active:
+            return reports
+
+        return reports + [
+            {
+                "companyShareId": share_id,
+                "companyName": name,
+                "scrip": symbol,
+                "shareTypeName": "IPO",
+                "statusName": "TRANSACTION_SUCCESS",
+                "applicantFormId": share_id * 1000 + self.index,
+            }
+            for share_id, symbol, name in CLOSED_ISSUES
+        ]
+
+    def fetch_applied_issues(self, refetch=False):
+        known = {issue.company_share_id for issue in self.issues}
+        for report in self.fetch_application_reports(active=False):
+            if report["companyShareId"] in known:
+                continue
+            self.issues.append(
+                Issue(
+                    name=report["companyName"],
+                    symbol=report["scrip"],
+                    status=report["statusName"],
+                    share_type=report["shareTypeName"],
+                    company_share_id=report["companyShareId"],
+                    applicant_form_id=report["applicantFormId"],
+                    old=False,
+                )
+            )
+        self.save()
+
+    def fetch_applied_issues_status(self, company_id=None):
+        for issue in self.issues:
+            if company_id is not None and issue.company_share_id != company_id:
+                continue
+            if issue.alloted is not None:
+                continue
+
+            self.server.request("fetch_applied_issues_status", self)
+            # Results of the issues still open are not out yet
+            if issue.company_share_id not in OPEN_SHARE_IDS:
+                issue.alloted = False
+        self.save()
+
+    def fetch_application_status(self, form_id=None, share_id=None):
+        self.server.request("fetch_application_status", self)
+        return {"statusName": "Verified", "reasonOrRemark": f"Form {form_id} verified"}
+
+    def fetch_portfolio(self):
+        self.server.request("fetch_portfolio", self)
+        entries = [
+            PortfolioEntry(
+                balance,
+                price,
+                price * 0.98,
+                symbol,
+                symbol,
+                balance * price,
+                balance * price * 0.98,
+            )
+            for symbol, balance, price in HOLDINGS
+        ]
+        self.portfolio = Portfolio(
+            entries,
+            len(entries),
+            sum(entry.value_as_of_last_transaction_price for entry in entries),
+            sum(entry.value_as_of_previous_closing_price for entry in entries),
+        )
+        self.save()
+        return self.portfolio
+
+
+class FakeMeroShare:
+    """MeroShare config holding a number of fake accounts"""
+
+    def __init__(self, accounts=10, latency=0.05, error_rate=0.0, seed=None):
+        self.server = FakeServer(latency, error_rate, seed)
+        self._accounts = [
+            FakeAccount(self.server, index, tag="family" if index % 2 else None)
+            for index in range(accounts)
+        ]
+        self.tag_selections = []
+        self.capitals = {}
+        self.logging_level = 20
+        self.telegram_bot_token = None
+        self.telegram_chat_id = None
+
+    @property
+    def accounts(self):
+        if not self.tag_selections:
+            return self._accounts
+        return [account for account in self._accounts if account.tag in self.tag_selections]
+
+    @property
+    def default_account(self):
+        if not self.accounts:
+            raise ValueError("No accounts found.")
+        return self.accounts[0]
+
+    def update_capital_list(self):
+        self.server.request("fetch_capital_list", self.default_account)
+        self.capitals = {"Fake Capital": 1}
+        return self.capitals
+
+    def save_data(self):
+        pass
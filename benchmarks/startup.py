@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""Cold-start benchmark for the headless apply path.
+
+Runs `main.py --headless` in fresh interpreters, stopping just before the
+config is loaded, and reports how long startup took. With -X importtime
+enabled it also lists the imports that cost the most.
+
+Usage: python benchmarks/startup.py [--runs N] [--top N]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter: time everything from the first import of
+# main up to the point where the headless path would start loading the config
+PROBE = r"""
+import sys, time
+started = time.perf_counter()
+sys.path.insert(0, {repo_dir!r})
+import main
+imported = time.perf_counter()
+main.BASE_DIR = {log_dir!r}
+
+def stop(self, password):
+    ready = time.perf_counter()
+    sys.__stdout__.write(f"STARTUP {{imported - started:.6f}} {{ready - started:.6f}}\n")
+    sys.__stdout__.flush()
+    main.os._exit(0)
+
+main.AutomatedNepseUtils.auto = stop
+sys.argv = ["main.py", "--headless"]
+main.main()
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def run_probe(log_dir, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", PROBE.format(repo_dir=REPO_DIR, log_dir=log_dir)]
+
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+
+    for line in completed.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            _, import_seconds, main_seconds = line.split()
+            return float(import_seconds), float(main_seconds), completed.stderr
+
+    raise RuntimeError(f"Startup probe did not report a timing:\n{completed.stderr}")
+
+
+def top_imports(importtime_output, count):
+    """Direct imports of main sorted by cumulative import time"""
+    # importtime prints children before their parent, one extra level of
+    # indentation (two spaces) per nesting level
+    children = []
+    for line in importtime_output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+
+        depth = len(match.group(3)) // 2
+        if depth == 1:
+            children.append((int(match.group(2)), match.group(4)))
+        elif depth == 0:
+            if match.group(4) == "main":
+                return sorted(children, reverse=True)[:count]
+            children = []
+
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start latency of main.py --headless")
+    parser.add_argument("--runs", type=int, default=10, help="Number of fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    import_times = []
+    main_times = []
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        for _ in range(args.runs):
+            import_seconds, main_seconds, _ = run_probe(log_dir)
+            import_times.append(import_seconds)
+            main_times.append(main_seconds)
+
+        _, _, importtime_output = run_probe(log_dir, importtime=True)
+
+    print(f"Runs: {args.runs}")
+    print(f"import main:          median {statistics.median(import_times) * 1000:8.1f} ms"
+          f"  min {min(import_times) * 1000:8.1f} ms")
+    print(f"main() to headless:   median {statistics.median(main_times) * 1000:8.1f} ms"
+          f"  min {min(main_times) * 1000:8.1f} ms")
+
+    print("\nSlowest imports made by main (cumulative, -X importtime):")
+    for cumulative_us, module in top_imports(importtime_output, args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
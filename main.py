@@ -2,68 +2,951 @@
 
 import argparse
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 import time
 import sys
 import json
-import tkinter as tk
-from tkinter import messagebox
+import math
+import queue
+import random
+import signal
+import threading
 from cmd import Cmd
 from getpass import getpass
 from typing import List
 from datetime import datetime
+from http.cookiejar import DefaultCookiePolicy
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from collections import deque
 import atexit
+import hashlib
 
-from cryptography.fernet import InvalidToken
-from tabulate import tabulate
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from cryptography.fernet import InvalidToken
+import nepseutils.core.account as nepseutils_account
 from nepseutils.core.account import Account
-from nepseutils.core.errors import LocalException
+from nepseutils.core.errors import GlobalError, LocalException
+from nepseutils.core.issue import Issue
 from nepseutils.core.meroshare import MeroShare
-from nepseutils.core.portfolio import PortfolioEntry
-from nepseutils.utils import config_converter
+from nepseutils.core.portfolio import Portfolio, PortfolioEntry
+
+# MeroShare already loads the account, issue and portfolio modules and
+# cryptography, so only tkinter, tabulate, config_converter, sqlite3 and
+# multiprocessing are left for first use to keep the headless startup short
 
 BASE_DIR = r'Your\Location\Here'
 
+STARTED_AT = time.monotonic()  # Reference point for the time-to-first-application metric
+
+CONSOLE_LOGGER = "console"  # Logger that receives everything printed to stdout/stderr
+APP_LOGGER = "autoapply"  # Logger of this script, with a level MeroShare's logging setup can't lower
+LOG_QUEUE_SIZE = 10000  # Log records buffered for the background writer
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+log_handler = None
+logger = logging.getLogger(APP_LOGGER)
+log_listener = None
+
+def tabulate(*args, **kwargs):
+    """Render a table, importing tabulate on first use"""
+    from tabulate import tabulate as render_table
+
+    return render_table(*args, **kwargs)
+
 class TeeLogger:
-    """A class that duplicates output to both a file and the original stream."""
+    """A class that duplicates output to both the application log and the original stream."""
     
-    def __init__(self, filename, original_stream):
-        # Change from 'a' (append) to 'w' (write) to overwrite previous log
-        self.file = open(filename, 'w', encoding='utf-8')
+    def __init__(self, logger, original_stream):
+        self.logger = logger
         self.original_stream = original_stream
+        # Worker threads print too, so partial lines are kept per thread
+        self.pending = threading.local()
         
     def write(self, message):
         self.original_stream.write(message)
-        self.file.write(message)
-        self.file.flush()  # Make sure it's written immediately
+
+        lines = (getattr(self.pending, "text", "") + message).split("\n")
+        self.pending.text = lines.pop()
+        for line in lines:
+            self.logger.info(line)
         
     def flush(self):
         self.original_stream.flush()
-        self.file.flush()
         
     def close(self):
-        # Make sure to close the file
-        if not self.file.closed:
-            self.file.close()
-    
-    def __del__(self):
-        # Ensure file is closed when object is garbage collected
-        self.close()
-
-# Set up regular logging
-log_filename = os.path.join(BASE_DIR, 'nepse_application.log')
-logging.basicConfig(filename=log_filename, filemode='w', level=logging.INFO,
-                   format='%(asctime)s - %(message)s',
-                   datefmt='%m/%d/%Y %I:%M:%S %p')  # Month/Day/Year 12-hour format with AM/PM
-logging.getLogger("urllib3").setLevel(logging.ERROR)
-
-# Set up console output redirection to also log to file
-original_stdout = sys.stdout
-original_stderr = sys.stderr
-sys.stdout = TeeLogger(log_filename, original_stdout)
-sys.stderr = TeeLogger(log_filename, original_stderr)
+        # Hand over whatever is left without a trailing newline
+        text = getattr(self.pending, "text", "")
+        if text:
+            self.pending.text = ""
+            self.logger.info(text)
+
+class BlockingQueueHandler(QueueHandler):
+    """Queue handler that waits for room instead of dropping records when the buffer is full."""
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+class LogFormatter(logging.Formatter):
+    """Timestamps log records, leaving console output as it was printed."""
+
+    def format(self, record):
+        if record.name == CONSOLE_LOGGER:
+            return record.getMessage()
+        return super().format(record)
+
+class PreviouslyAppliedStore:
+    """Previously applied shares, kept in an append-only JSON Lines journal.
+
+    Each record is appended and fsynced on its own, so recording a share never
+    rewrites (or risks truncating) the records before it. Records are indexed
+    by scrip and close date; a later record for the same share replaces the
+    earlier one and leaves a stale line that compaction removes.
+    """
+
+    def __init__(self, filename, legacy_filename=None):
+        self.filename = filename
+        self.legacy_filename = legacy_filename
+        self.index = {}
+        self.journal_lines = 0
+        self.load()
+
+    @property
+    def records(self):
+        return list(self.index.values())
+
+    def load(self):
+        """Load the journal, migrating the old JSON list file if needed"""
+        if not os.path.exists(self.filename):
+            if self.legacy_filename and os.path.exists(self.legacy_filename):
+                self.migrate_legacy_file()
+            return
+
+        needs_compaction = False
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                self.journal_lines += 1
+                if not line.endswith("\n"):
+                    # Left behind by a write that was interrupted
+                    needs_compaction = True
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping corrupt record in {self.filename}")
+                    needs_compaction = True
+                    continue
+                self.index[(record["scrip"], record["close_date"])] = record
+
+        # Rewrite before appending so new records never follow a partial line
+        if needs_compaction:
+            self.compact()
+
+    def migrate_legacy_file(self):
+        """Convert the previous JSON list file into a journal, once"""
+        try:
+            with open(self.legacy_filename, 'r') as f:
+                records = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Error reading {self.legacy_filename}, starting a new journal")
+            records = []
+
+        for record in records:
+            self.index[(record["scrip"], record["close_date"])] = record
+
+        self.compact()
+        os.replace(self.legacy_filename, self.legacy_filename + ".bak")
+        print(f"Migrated {len(records)} previously applied shares to {self.filename}")
+
+    def contains(self, scrip, close_date):
+        return (scrip, close_date) in self.index
+
+    def add(self, record):
+        self.index[(record["scrip"], record["close_date"])] = record
+
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_lines += 1
+
+    def clear(self):
+        self.index = {}
+        self.compact()
+
+    def compact(self):
+        """Atomically rewrite the journal with one line per record"""
+        temp_filename = self.filename + ".tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            for record in self.index.values():
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.filename)
+        self.journal_lines = len(self.index)
+
+    def flush(self):
+        """Compact the journal if it has collected stale lines"""
+        if self.journal_lines > len(self.index):
+            self.compact()
+
+class ApplicationJournal:
+    """Write-ahead log of applications, so a restarted run resumes where it stopped.
+
+    An "intent" line is fsynced before an account is applied for and a "done"
+    line written once MeroShare has answered. Accounts with a done, applied
+    line are skipped by the next run; an intent without one is settled from
+    the account's application reports. Lines of a share are dropped once it
+    is recorded as previously applied, and answers that arrive for it later
+    are ignored.
+    """
+
+    def __init__(self, filename, finished=()):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.states = {}
+        self.finished = set(finished)
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.filename):
+            return
+
+        needs_rewrite = False
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    if not line.endswith("\n"):
+                        raise ValueError("Partial line")
+                    record = json.loads(line)
+                except ValueError:
+                    # Left behind by a write that was interrupted
+                    needs_rewrite = True
+                    continue
+                if record["share_id"] in self.finished:
+                    # Written after the share was finished by an earlier run
+                    needs_rewrite = True
+                    continue
+                self.states[(record["share_id"], record["dmat"])] = record
+
+        if needs_rewrite:
+            self.rewrite()
+
+    def applied(self, share_id, dmat):
+        record = self.states.get((share_id, dmat))
+        return record is not None and record["state"] == "done" and record["applied"]
+
+    def record(self, share_id, dmat, state, applied=None):
+        record = {"share_id": share_id, "dmat": dmat, "state": state, "applied": applied}
+        with self.lock:
+            if state == "intent":
+                self.finished.discard(share_id)
+            elif share_id in self.finished:
+                # A timed out application answering after its share was finished
+                return
+            self.states[(share_id, dmat)] = record
+            with open(self.filename, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+                # A lost "done" line only costs a reports check next run, but
+                # an intent has to be on disk before the application is sent
+                if state == "intent":
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def finish(self, share_id):
+        """Forget a share whose applications are complete"""
+        with self.lock:
+            self.finished.add(share_id)
+            self.states = {key: record for key, record in self.states.items() if key[0] != share_id}
+            self.rewrite()
+
+    def rewrite(self):
+        temp_filename = self.filename + ".tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            for record in self.states.values():
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.filename)
+
+class SessionManager:
+    """Keeps MeroShare accounts logged in for the length of a run.
+
+    Sessions are reused across commands until they are older than the TTL,
+    at which point the account is logged out and back in. A session MeroShare
+    rejects earlier is dropped by call(), so the next call logs in again. A
+    login MeroShare turns down isn't tried again for `login_retry_delay`
+    seconds. All accounts are logged out once at shutdown.
+    """
+
+    def __init__(self, ttl, login_retry_delay=0):
+        self.ttl = ttl
+        self.login_retry_delay = login_retry_delay
+        self.logged_in_at = {}
+        self.login_errors = {}
+        self.account_locks = {}
+        self.lock = threading.Lock()
+
+    def account_lock(self, account):
+        with self.lock:
+            return self.account_locks.setdefault(account, threading.Lock())
+
+    def get(self, account):
+        """Return the account with a live session, logging in if needed"""
+        with self.account_lock(account):
+            logged_in_at = self.logged_in_at.get(account)
+            if (
+                account.auth_token
+                and logged_in_at is not None
+                and time.monotonic() - logged_in_at < self.ttl
+            ):
+                return account
+
+            login_error = self.login_errors.get(account)
+            if login_error is not None and time.monotonic() - login_error[0] < self.login_retry_delay:
+                raise LocalException(login_error[1])
+
+            if account.auth_token:
+                try:
+                    account.logout()
+                except Exception:
+                    account.auth_token = None
+
+            try:
+                account.login()
+            except LocalException as e:
+                # Wrong or expired credentials; nepseutils has already tried
+                # the login three times
+                self.login_errors[account] = (time.monotonic(), str(e))
+                raise
+            self.login_errors.pop(account, None)
+            self.logged_in_at[account] = time.monotonic()
+            return account
+
+    def login_failed(self, account):
+        """Whether MeroShare turned down the account's last login"""
+        return account in self.login_errors
+
+    def invalidate(self, account):
+        """Forget an account's session so the next get() logs in again"""
+        with self.account_lock(account):
+            account.auth_token = None
+            self.logged_in_at.pop(account, None)
+
+    def call(self, account, method, *args, **kwargs):
+        """Call an account method with a live session, dropping the session if the call fails"""
+        try:
+            return getattr(self.get(account), method)(*args, **kwargs)
+        except LocalException:
+            # nepseutils raises LocalException for rejected requests, an
+            # expired token among them
+            self.invalidate(account)
+            raise
+
+    def close(self):
+        """Log out every account that still has a session"""
+        accounts = [account for account in self.logged_in_at if account.auth_token]
+        self.logged_in_at = {}
+
+        for account in accounts:
+            try:
+                account.logout()
+            except Exception:
+                print(f"Failed to logout for {account.name}!")
+
+class PooledTransport:
+    """Keep-alive HTTP transport shared by every account in a MeroShare config.
+
+    nepseutils calls requests.get/post directly, so every MeroShare call opens
+    (and TLS handshakes) a new connection. Installing this transport routes
+    those calls through one pooled Session instead.
+    """
+
+    def __init__(self, pool_size, retries, backoff, timeout=None, on_request=None):
+        self.on_request = on_request
+        # nepseutils sets no timeout, so a connection that never answers
+        # would otherwise hang its account forever
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Accounts are told apart by their Authorization header alone; never
+        # let a cookie set for one account ride along on another's requests
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        # Only connection errors are retried, since the request never reached
+        # the server and retrying a POST such as apply is still safe
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=Retry(
+                total=retries,
+                connect=retries,
+                read=0,
+                status=0,
+                backoff_factor=backoff,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, **kwargs):
+        if self.on_request:
+            self.on_request(url)
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        if self.on_request:
+            self.on_request(url)
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def __getattr__(self, name):
+        # Anything else (Session, exceptions, ...) comes from requests itself
+        return getattr(requests, name)
+
+    def install(self):
+        """Route nepseutils account requests through this transport"""
+        nepseutils_account.requests = self
+
+    def close(self):
+        self.session.close()
+
+class ResponseCache:
+    """On-disk cache of MeroShare responses with a TTL per endpoint.
+
+    Entries older than their endpoint's TTL are not served to normal runs but
+    are kept (up to the retention period) so offline mode can still use them.
+    """
+
+    ttls = {
+        "applicable_issues": 60,
+        "application_reports": 300,
+        "portfolio": 3600,
+    }
+    retention = 30 * 24 * 60 * 60  # Seconds before any entry is evicted
+
+    def __init__(self, filename):
+        self.lock = threading.Lock()
+        import sqlite3
+
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "endpoint TEXT, account TEXT, value TEXT, fetched_at REAL, "
+                "PRIMARY KEY (endpoint, account))"
+            )
+            self.connection.execute(
+                "DELETE FROM cache WHERE fetched_at < ?", (time.time() - self.retention,)
+            )
+
+    def get(self, endpoint, account, stale=False):
+        """Return the cached value, or None if missing or older than the TTL"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, fetched_at FROM cache WHERE endpoint = ? AND account = ?",
+                (endpoint, account),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, fetched_at = row
+        if not stale and time.time() - fetched_at > self.ttls[endpoint]:
+            return None
+
+        return json.loads(value)
+
+    def put(self, endpoint, account, value):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cache (endpoint, account, value, fetched_at) VALUES (?, ?, ?, ?)",
+                (endpoint, account, json.dumps(value), time.time()),
+            )
+
+    def invalidate(self, *endpoints):
+        with self.lock, self.connection:
+            for endpoint in endpoints:
+                self.connection.execute("DELETE FROM cache WHERE endpoint = ?", (endpoint,))
+
+class PortfolioAggregator:
+    """Combines portfolio entries of several accounts into one entry per scrip."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, entries):
+        for entry in entries:
+            combined_entry = self.entries.get(entry.script)
+
+            if combined_entry is None:
+                self.entries[entry.script] = PortfolioEntry(
+                    current_balance=entry.current_balance,
+                    last_transaction_price=entry.last_transaction_price,
+                    previous_closing_price=entry.previous_closing_price,
+                    script=entry.script,
+                    script_desc=entry.script_desc,
+                    value_as_of_last_transaction_price=entry.value_as_of_last_transaction_price,
+                    value_as_of_previous_closing_price=entry.value_as_of_previous_closing_price,
+                )
+                continue
+
+            combined_entry.current_balance += entry.current_balance
+            combined_entry.value_as_of_last_transaction_price += (
+                entry.value_as_of_last_transaction_price
+            )
+            combined_entry.value_as_of_previous_closing_price += (
+                entry.value_as_of_previous_closing_price
+            )
+
+    def result(self) -> "List[PortfolioEntry]":
+        return list(self.entries.values())
+
+def issue_totals(accounts, since=None, until=None, by_tag=False):
+    """Applied, rejected, allocations, units and amount alloted per account (or per tag).
+
+    Accounts are keyed by their position in `accounts`. Issues are counted
+    in one pass over each account, keeping only those applied within the
+    date range when one is given (dates as YYYY-MM-DD).
+    """
+    totals = {}
+    for position, account in enumerate(accounts):
+        applied = rejected = alloted = 0
+        units = amount = 0.0
+
+        for issue in account.issues:
+            if since or until:
+                applied_date = (issue.applied_date or "")[:10]
+                if not applied_date or (since and applied_date < since) or (until and applied_date > until):
+                    continue
+
+            applied += 1
+            if issue.alloted:
+                alloted += 1
+                units += issue.alloted_quantity or 0
+                amount += issue.applied_amount or 0
+            if issue.status == "BLOCK_FAILED":
+                rejected += 1
+
+        key = (account.tag or "untagged") if by_tag else position
+        if by_tag and not applied:
+            continue
+        row = totals.get(key)
+        if row is None:
+            totals[key] = [applied, rejected, alloted, units, amount]
+        else:
+            row[0] += applied
+            row[1] += rejected
+            row[2] += alloted
+            row[3] += units
+            row[4] += amount
+
+    return totals
+
+class CallRecorder:
+    """Times MeroShare calls and appends one JSON event per call to the run log.
+
+    Retries are counted as repeated requests to the same URL within one call,
+    which is how nepseutils' retry decorators show up on the wire.
+    """
+
+    endpoints = (
+        "login",
+        "logout",
+        "fetch_applicable_issues",
+        "apply",
+        "fetch_portfolio",
+        "fetch_application_reports",
+        "fetch_application_status",
+        "fetch_applied_issues",
+        "fetch_applied_issues_status",
+    )
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.run_id = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.lock = threading.Lock()
+        self.file = None
+        self.active = threading.local()
+
+    def instrument(self, account):
+        """Record every MeroShare call made through the account"""
+        for endpoint in self.endpoints:
+            setattr(account, endpoint, self.wrap(account, endpoint, getattr(account, endpoint)))
+
+    def wrap(self, account, endpoint, method):
+        def recorded(*args, **kwargs):
+            return self.call(account, endpoint, method, *args, **kwargs)
+
+        return recorded
+
+    def call(self, account, endpoint, method, *args, **kwargs):
+        if not hasattr(self.active, "calls"):
+            self.active.calls = []
+
+        requests_made = {}
+        self.active.calls.append(requests_made)
+        status = "ok"
+        error = None
+        started = time.perf_counter()
+
+        try:
+            return method(*args, **kwargs)
+        except Exception as e:
+            status = "error"
+            error = str(e)
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            self.active.calls.pop()
+            self.record({
+                "run": self.run_id,
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "account": account.name,
+                "endpoint": endpoint,
+                "duration_ms": round(duration * 1000, 1),
+                "status": status,
+                "error": error,
+                "retries": sum(count - 1 for count in requests_made.values()),
+            })
+
+    def count_request(self, url):
+        """Called by the transport for every HTTP request, to count retries"""
+        calls = getattr(self.active, "calls", None)
+        if calls:
+            calls[-1][url] = calls[-1].get(url, 0) + 1
+
+    def record(self, event):
+        line = json.dumps(event)
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.filename, 'a', encoding='utf-8')
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    @staticmethod
+    def load_events(filename):
+        """Load the events recorded by every past run"""
+        if not os.path.exists(filename):
+            return []
+
+        events = []
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return events
+
+class IssueWatcher:
+    """Detects new issues in successive applicable issue lists.
+
+    The applicable issues endpoint is a POST with no ETag or Last-Modified
+    support, so the set of companyShareIds seen last time stands in for one.
+    """
+
+    def __init__(self):
+        self.seen = None
+
+    def new_issues(self, issues):
+        """Return the issues that were not in the previous list"""
+        ids = frozenset(issue.get("companyShareId") for issue in issues)
+        if ids == self.seen:
+            return []
+
+        seen = self.seen or frozenset()
+        self.seen = ids
+        return [issue for issue in issues if issue.get("companyShareId") not in seen]
+
+    def forget(self, share_id):
+        """Report the issue as new again on the next list that has it"""
+        if self.seen is not None:
+            self.seen = self.seen - {share_id}
+
+class RequestCoalescer:
+    """Shares one in-flight request, and its result, between everyone asking for the same data.
+
+    Results are kept for the rest of the run until forgotten; a failed
+    request is not kept, so the next caller tries again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = {}
+
+    def get(self, key, fetch):
+        with self.lock:
+            result = self.results.get(key)
+            owner = result is None
+            if owner:
+                result = self.results[key] = Future()
+
+        if owner:
+            try:
+                result.set_result(fetch())
+            except BaseException as e:
+                self.forget(key)
+                result.set_exception(e)
+
+        return result.result()
+
+    def forget(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.results.pop(key, None)
+
+class RequestController:
+    """Adapts how many account operations run at once to how MeroShare is coping.
+
+    The limit grows by one after a limit's worth of successes in a row and is
+    halved on every failure (AIMD). When more than trip_ratio of the recent
+    results failed, the circuit breaker opens and no new operation starts
+    until the cooldown has passed.
+
+    acquire() hands out a lease that release() accepts once, so a slot given
+    up on after a timeout isn't released a second time when the late request
+    finally returns.
+    """
+
+    def __init__(self, max_limit, window=20, min_samples=5, trip_ratio=0.5, cooldown=30,
+                 backoff_base=2, backoff_cap=60):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.window = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.trip_ratio = trip_ratio
+        self.cooldown = cooldown
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.condition = threading.Condition()
+        self.leases = set()
+        self.successes = 0
+        self.open_until = 0
+
+    def acquire(self):
+        with self.condition:
+            while True:
+                paused = self.open_until - time.monotonic()
+                if paused > 0:
+                    self.condition.wait(paused)
+                elif len(self.leases) < self.limit:
+                    lease = object()
+                    self.leases.add(lease)
+                    return lease
+                else:
+                    self.condition.wait()
+
+    def release(self, lease, ok):
+        with self.condition:
+            if lease not in self.leases:
+                return
+            self.leases.remove(lease)
+            self.window.append(ok)
+
+            if ok:
+                self.successes += 1
+                if self.successes >= self.limit:
+                    self.limit = min(self.max_limit, self.limit + 1)
+                    self.successes = 0
+            else:
+                self.limit = max(1, self.limit // 2)
+                self.successes = 0
+
+                failures = self.window.count(False)
+                if len(self.window) >= self.min_samples and failures > self.trip_ratio * len(self.window):
+                    logger.warning(
+                        f"{failures} of the last {len(self.window)} requests failed, "
+                        f"pausing for {self.cooldown}s"
+                    )
+                    self.open_until = time.monotonic() + self.cooldown
+                    self.window.clear()
+
+            self.condition.notify_all()
+
+    def backoff(self, attempt):
+        """Delay before retry number `attempt`: exponential, capped, with full jitter"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+class AccountIndex:
+    """Accounts grouped by tag, so a tag selection doesn't scan every account.
+
+    Selections keep the config order; rebuild the index whenever accounts
+    are added, removed or retagged.
+    """
+
+    def __init__(self, accounts):
+        self.positions = {}
+        self.by_tag = {}
+        for position, account in enumerate(accounts):
+            self.positions[account] = position
+            self.by_tag.setdefault(account.tag, []).append(account)
+        self.accounts = list(accounts)
+
+    def select(self, tags):
+        if not tags:
+            return list(self.accounts)
+
+        selected = [account for tag in set(tags) for account in self.by_tag.get(tag, ())]
+        return sorted(selected, key=self.positions.__getitem__)
+
+def account_balance(account):
+    """Value of an account's saved portfolio, at the last transaction price"""
+    return sum(entry.value_as_of_last_transaction_price for entry in account.portfolio.entries)
+
+class ConfigSaver:
+    """Coalesces config writes.
+
+    Saving re-encrypts and rewrites the whole config, so a save request only
+    marks the config dirty and schedules one write `delay` seconds later;
+    every request made in the meantime is covered by that write. flush()
+    writes right away and must be called before the process exits.
+    """
+
+    def __init__(self, save, delay):
+        self.save = save
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.dirty = False
+        self.timer = None
+
+    def request(self):
+        with self.lock:
+            self.dirty = True
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                if not self.dirty:
+                    return
+                self.dirty = False
+
+            try:
+                self.save()
+            except BaseException:
+                with self.lock:
+                    self.dirty = True
+                raise
+
+def agent_authkey(password):
+    return hashlib.sha256(b"nepseutils-agent:" + password.encode("utf-8")).digest()
+
+def agent_request(filename, password, request):
+    """Send a request to the running credential agent, or return None if there is none"""
+    # Only try to connect when an agent has been started, since a refused
+    # connection can take seconds on Windows
+    try:
+        with open(filename, "r") as f:
+            address = tuple(json.load(f)["address"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Client
+
+    try:
+        with Client(address, authkey=agent_authkey(password)) as connection:
+            connection.send(request)
+            return connection.recv()
+    except (OSError, EOFError, AuthenticationError):
+        return None
+
+class CredentialAgent:
+    """Keeps decrypted configs in memory so later runs skip key derivation and decryption.
+
+    Listens on a local socket that only clients knowing the password can
+    use (multiprocessing's HMAC challenge), and exits after `idle_timeout`
+    seconds without a request. Configs are handed over by the first run
+    that decrypts them, and are only served while the file is unchanged.
+    """
+
+    def __init__(self, filename, password, idle_timeout):
+        self.filename = filename
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.configs = {}
+        self.stopping = False
+        self.timer = None
+
+    def serve(self):
+        from multiprocessing import AuthenticationError
+        from multiprocessing.connection import Listener
+
+        listener = Listener(("127.0.0.1", 0), authkey=agent_authkey(self.password))
+        with open(self.filename, "w") as f:
+            json.dump({"address": listener.address, "pid": os.getpid()}, f)
+
+        print(f"Credential agent listening, exits after {self.idle_timeout:.0f}s idle")
+        try:
+            self.touch()
+            while not self.stopping:
+                try:
+                    connection = listener.accept()
+                except (AuthenticationError, OSError, EOFError):
+                    # accept() runs the handshake, which a wrong password or
+                    # a client dropping out of it fails
+                    continue
+
+                with connection:
+                    try:
+                        connection.send(self.handle(connection.recv()))
+                    except (OSError, EOFError):
+                        continue
+
+                self.touch()
+        finally:
+            if self.timer is not None:
+                self.timer.cancel()
+            listener.close()
+            self.configs.clear()
+            if os.path.exists(self.filename):
+                os.remove(self.filename)
+
+    def handle(self, request):
+        command = request[0]
+        if command == "get":
+            return self.configs.get(request[1])
+        if command == "put":
+            self.configs[request[1]] = request[2]
+        elif command == "forget":
+            self.configs.pop(request[1], None)
+        elif command == "stop":
+            self.stopping = True
+        return True
+
+    def touch(self):
+        """Restart the idle countdown"""
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(self.idle_timeout, self.expire)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def expire(self):
+        # accept() can't be interrupted from another thread, so the agent
+        # asks itself to stop
+        print("Credential agent idle, exiting")
+        agent_request(self.filename, self.password, ("stop",))
 
 class AutomatedNepseUtils(Cmd):
     prompt = "NepseUtils > "
@@ -73,56 +956,321 @@ class AutomatedNepseUtils(Cmd):
     ordinary_shares = []
     current_share_index = 0
     application_summary = []
-    previously_applied_file = os.path.join(BASE_DIR, 'previously_applied_shares.json')
+    previously_applied_file = os.path.join(BASE_DIR, 'previously_applied_shares.jsonl')
+    legacy_previously_applied_file = os.path.join(BASE_DIR, 'previously_applied_shares.json')
+    sync_state_file = os.path.join(BASE_DIR, 'sync_state.json')
+    cache_file = os.path.join(BASE_DIR, 'nepse_cache.db')
+    call_log_file = os.path.join(BASE_DIR, 'nepse_calls.jsonl')
+    application_journal_file = os.path.join(BASE_DIR, 'pending_applications.jsonl')
+    _application_journal = None
+    _applied_share_ids = None
+    _coalescer = None
+    _call_log = None
+    _cache = None
+    offline = False  # Serve cached data only, without touching the network
+    _previously_applied = None
+    password = "PASSWORD HERE"  # Automatically entered NepseUtils password
+    apply_quantity = "10"  # Always apply for 10 units
     skip_popups_until_end = True  # Flag to control popup behavior
+    first_application_at = None  # When the first account's application finished
+    exit_after_apply = True  # Show the final popup and exit once the automatic apply is done
+    apply_max_workers = 8  # Maximum number of accounts applied for at the same time
+    apply_timeout = 120  # Seconds to wait for a single account's application
+    session_ttl = 600  # Seconds an account stays logged in before logging in again
+    login_retry_delay = 60  # Seconds before an account whose login was turned down tries again
+    sync_max_workers = 8  # Maximum number of fetches running at the same time during sync
+    poll_interval = 300  # Seconds between polls in daemon mode
+    poll_jitter = 0.1  # Random spread of each poll delay, as a fraction of it
+    poll_max_backoff = 3600  # Longest delay between polls after repeated failures
+    stop_event = threading.Event()  # Set to wake the daemon up and stop it
+    popups = None  # Popups waiting for the popup thread, see queue_popup_message
+    http_pool_size = 8  # Keep-alive connections shared by all accounts
+    http_retries = 3  # Retries on connection errors
+    http_backoff = 0.5  # Backoff factor between connection retries
+    http_timeout = 30  # Seconds to wait for MeroShare to connect or answer
+    save_delay = 10  # Seconds to gather config changes into a single write
+    saver = None
+    agent_file = os.path.join(BASE_DIR, 'nepse_agent.json')
+    agent_idle_timeout = 3600  # Seconds the credential agent keeps configs without being used
+    _agent_password = None
+    _sessions = None
+    _account_index = None
+    _request_controller = None
+    apply_retries = 3  # Extra rounds for accounts whose application failed with an error
+    account_priority = "config"  # Order accounts are worked through in: "config" or "balance"
 
     def preloop(self, *args, **kwargs):
-        if not (MeroShare.default_config_path()).exists():
+        self.load_config(self.password)
+
+        if self.offline:
+            print("Offline mode: portfolio, stats and previously_applied are served from cache.")
+            return
+        
+        # After successful login, automatically process the "apply" command
+        self.do_automated_apply("")
+
+    def load_config(self, password, config_path=None):
+        """Load (or create) the MeroShare config and prepare it for this run.
+
+        Only the default config is created when missing; a config_path given
+        explicitly has to exist.
+        """
+        if not self.offline:
+            self.transport = PooledTransport(
+                self.http_pool_size,
+                self.http_retries,
+                self.http_backoff,
+                timeout=self.http_timeout,
+                on_request=self.call_log.count_request,
+            )
+            self.transport.install()
+
+        self.config_path = config_path or MeroShare.default_config_path()
+        self._agent_password = password
+
+        if config_path is None and not (MeroShare.default_config_path()).exists():
+            from nepseutils.utils import config_converter
+
             config_converter.pre_versioning_to_current()
 
-            logging.info("Creating a new data file! Existing file not found!")
+            logger.info("Creating a new data file! Existing file not found!")
 
             MeroShare.default_config_directory().mkdir(parents=True, exist_ok=True)
 
-            password = "PASSWORD HERE"  # Automatically enter password
             self.ms = MeroShare.new(password)
 
         else:
-            # Wait for the prompt before entering password
-            sys.stdout.write("Waiting for password prompt...\n")
-            time.sleep(1)  # Give time for the prompt to appear
-            
-            password = "PASSWORD HERE"  # Automatically enter password
-            
-            try:
-                self.ms = MeroShare.load(password)
-                sys.stdout.write("Password entered successfully!\n")
-            except InvalidToken as e:
-                print("Incorrect password!")
-                print(e)
-                exit()
-        
-        # After successful login, automatically process the "apply" command
-        time.sleep(1)  # Wait for the prompt to appear
-        self.do_automated_apply("")
+
+            self.ms = self.load_from_agent()
+            if self.ms is None:
+                try:
+                    self.ms = MeroShare.load(password, config_path)
+                    if config_path is not None:
+                        # MeroShare always points config_path at the default config
+                        self.ms.config_path = config_path
+                except InvalidToken as e:
+                    print("Incorrect password!")
+                    print(e)
+                    exit()
+
+                self.share_with_agent()
+            sys.stdout.write("Password entered successfully!\n")
+
+        attach_log_handler()
+        self.make_saves_thread_safe()
+
+        for account in self.ms.accounts:
+            self.call_log.instrument(account)
+
+    def auto(self, password, config_path=None):
+        """Apply for new shares without starting the interactive prompt"""
+        self.load_config(password, config_path)
+        print("Running headless apply...")
+        self.do_apply("")
+
+    def load_from_agent(self):
+        """Build the config from the credential agent, if it holds a copy of the current file"""
+        entry = agent_request(self.agent_file, self._agent_password, ("get", str(self.config_path)))
+        if entry is None or entry["mtime"] != os.stat(self.config_path).st_mtime_ns:
+            return None
+
+        config = entry["config"]
+        ms = MeroShare(
+            fernet=entry["fernet"],
+            accounts=[],
+            capitals=config["capitals"],
+            config_version=config["config_version"],
+            logging_level=config["logging_level"],
+            config_path=self.config_path,
+            telegram_bot_token=config["telegram_bot_token"],
+            telegram_chat_id=config["telegram_chat_id"],
+        )
+        ms.config_path = self.config_path
+        ms._accounts = [Account.from_json(account, ms.save_data) for account in config["accounts"]]
+        logger.info("Config loaded from the credential agent")
+        return ms
+
+    def share_with_agent(self):
+        """Hand the decrypted config to the credential agent, if one is running"""
+        if self._agent_password is None:
+            return
+
+        entry = {
+            "fernet": self.ms.fernet,
+            "mtime": os.stat(self.config_path).st_mtime_ns,
+            "config": {
+                "capitals": self.ms.capitals,
+                "config_version": self.ms.config_version,
+                "logging_level": self.ms.logging_level,
+                "telegram_bot_token": self.ms.telegram_bot_token,
+                "telegram_chat_id": self.ms.telegram_chat_id,
+                "accounts": [account.to_json() for account in self.ms._accounts],
+            },
+        }
+        agent_request(self.agent_file, self._agent_password, ("put", str(self.config_path), entry))
+
+    def write_config(self):
+        self.ms.save_data()
+        self.share_with_agent()
+
+    def save_config(self):
+        """Ask for the config to be written; changes made shortly after share the write"""
+        self.saver.request()
+
+    def make_saves_thread_safe(self):
+        """Coalesce config writes, including those of accounts running in worker threads"""
+        self.saver = ConfigSaver(self.write_config, self.save_delay)
+        # os._exit skips this, so final_popup_and_exit flushes on its own
+        atexit.register(self.saver.flush)
+
+        for account in self.ms.accounts:
+            account.save = self.saver.request
+
+    @property
+    def coalescer(self):
+        """Request coalescer for account-independent data in this run"""
+        if self._coalescer is None:
+            self._coalescer = RequestCoalescer()
+        return self._coalescer
+
+    @property
+    def call_log(self):
+        """Structured log of MeroShare calls made in this run"""
+        if self._call_log is None:
+            self._call_log = CallRecorder(self.call_log_file)
+        return self._call_log
+
+    @property
+    def previously_applied(self):
+        """Previously applied shares store, loaded on first use"""
+        if self._previously_applied is None:
+            self._previously_applied = PreviouslyAppliedStore(
+                self.previously_applied_file, self.legacy_previously_applied_file
+            )
+        return self._previously_applied
+
+    def selected_accounts(self):
+        """Accounts of the selected tags (all if none are selected), in priority order"""
+        if self._account_index is None:
+            self._account_index = AccountIndex(self.ms._accounts)
+
+        accounts = self._account_index.select(self.ms.tag_selections)
+        if self.account_priority == "balance":
+            # Largest portfolios first, so they get in first when MeroShare is overloaded
+            accounts.sort(key=account_balance, reverse=True)
+        return accounts
+
+    @property
+    def application_journal(self):
+        """Write-ahead log of the applications of this and any interrupted earlier run"""
+        if self._application_journal is None:
+            self._application_journal = ApplicationJournal(
+                self.application_journal_file,
+                {record["id"] for record in self.previously_applied.records if "id" in record},
+            )
+        return self._application_journal
+
+    @property
+    def applied_share_ids(self):
+        """companyShareIds each account has applied for, fetched once per run"""
+        if self._applied_share_ids is None:
+            self._applied_share_ids = {}
+        return self._applied_share_ids
+
+    @property
+    def request_controller(self):
+        """Concurrency limit and circuit breaker shared by every apply in this run"""
+        if self._request_controller is None:
+            self._request_controller = RequestController(self.apply_max_workers)
+        return self._request_controller
+
+    @property
+    def sessions(self):
+        """Session manager shared by every command in this run"""
+        if self._sessions is None:
+            self._sessions = SessionManager(self.session_ttl, self.login_retry_delay)
+        return self._sessions
+
+    @property
+    def cache(self):
+        """Response cache shared by every command in this run"""
+        if self._cache is None:
+            self._cache = ResponseCache(self.cache_file)
+        return self._cache
+
+    def cached_fetch(self, endpoint, account, fetch, refresh=False):
+        """Return a cached response for the account, fetching it when missing or expired"""
+        if not refresh:
+            value = self.cache.get(endpoint, account.dmat, stale=self.offline)
+            if value is not None:
+                return value
+
+        if self.offline:
+            raise LocalException(f"No cached {endpoint.replace('_', ' ')} for {account.name}!")
+
+        value = fetch()
+        self.cache.put(endpoint, account.dmat, value)
+        return value
+
+    def fetch_applicable_issues(self, refresh=False):
+        """Fetch the applicable issues once per run, through the default account.
+
+        Callers asking at the same time share a single request. account.apply
+        still fetches its own list, since the per-account "action" field is how
+        nepseutils tells an issue is already applied for.
+        """
+        account = self.ms.default_account
+        if refresh:
+            self.coalescer.forget("applicable_issues")
+
+        return self.coalescer.get(
+            "applicable_issues",
+            lambda: self.cached_fetch(
+                "applicable_issues",
+                account,
+                lambda: self.sessions.call(account, "fetch_applicable_issues"),
+                refresh,
+            ),
+        )
+
+    def update_capital_list(self):
+        """Update the capital list at most once per run"""
+        return self.coalescer.get("capitals", self.ms.update_capital_list)
+
+    def fetch_application_reports(self, account, refresh=False):
+        return self.cached_fetch(
+            "application_reports",
+            account,
+            lambda: self.sessions.call(account, "fetch_application_reports"),
+            refresh,
+        )
+
+    def fetch_portfolio(self, account, refresh=False):
+        """Fetch the portfolio of an account, falling back to the saved one when offline"""
+        try:
+            portfolio = self.cached_fetch(
+                "portfolio",
+                account,
+                lambda: self.sessions.call(account, "fetch_portfolio").to_json(),
+                refresh,
+            )
+        except LocalException:
+            if not self.offline:
+                raise
+            return account.portfolio
+
+        account.portfolio = Portfolio.from_json(portfolio)
+        return account.portfolio
 
     def load_previously_applied_shares(self):
-        """Load previously applied shares from JSON file"""
-        if os.path.exists(self.previously_applied_file):
-            try:
-                with open(self.previously_applied_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print(f"Error reading {self.previously_applied_file}, creating new one")
-                return []
-        return []
+        """Return the list of previously applied shares"""
+        return self.previously_applied.records
 
     def save_previously_applied_share(self, share_info):
         """Save applied share info to track previously applied shares"""
-        previously_applied = self.load_previously_applied_shares()
-        
         # Add new share info with timestamp
         share_record = {
+            "id": share_info["id"],
             "scrip": share_info["scrip"],
             "name": share_info["name"],
             "close_date": share_info["close_date"],
@@ -131,20 +1279,11 @@ class AutomatedNepseUtils(Cmd):
             "failed_count": sum(1 for result in share_info['results'] if not result['applied'])
         }
         
-        previously_applied.append(share_record)
-        
-        with open(self.previously_applied_file, 'w') as f:
-            json.dump(previously_applied, f, indent=4)
+        self.previously_applied.add(share_record)
 
     def is_share_previously_applied(self, scrip, close_date):
         """Check if a share has been previously applied based on scrip and close date"""
-        previously_applied = self.load_previously_applied_shares()
-        
-        for share in previously_applied:
-            if share["scrip"] == scrip and share["close_date"] == close_date:
-                return True
-                
-        return False
+        return self.previously_applied.contains(scrip, close_date)
 
     def help_add(self):
         print("Add a new account!")
@@ -177,7 +1316,7 @@ class AutomatedNepseUtils(Cmd):
         if not capital_id:
             print("Could not find capital ID for given DMAT!")
             print("Updating capital list!")
-            self.ms.update_capital_list()
+            self.update_capital_list()
             capital_id = self.ms.capitals.get(dmat[3:8])
 
         if not capital_id:
@@ -192,10 +1331,13 @@ class AutomatedNepseUtils(Cmd):
         except LocalException as e:
             print(f"Failed to obtain details for account: {e}")
 
+        account.save = self.saver.request
+        self.call_log.instrument(account)
         self.ms.accounts.append(account)
-        self.ms.save_data()
+        self._account_index = None
+        self.save_config()
 
-        logging.info(f"Successfully obtained details for account: {account.name}")
+        logger.info(f"Successfully obtained details for account: {account.name}")
 
     def help_remove(self):
         print("Remove an account!")
@@ -206,7 +1348,8 @@ class AutomatedNepseUtils(Cmd):
         self.do_list(args="accounts")
         account_id = input("Choose an account ID: ")
         del self.ms.accounts[int(account_id) - 1]
-        self.ms.save_data()
+        self._account_index = None
+        self.save_config()
         print("Account removed!")
 
     def list_accounts_full(self):
@@ -245,7 +1388,7 @@ class AutomatedNepseUtils(Cmd):
         print(tabulate(table, headers=headers, tablefmt="pretty"))
 
     def list_results(self):
-        results = self.ms.default_account.fetch_application_reports()
+        results = self.fetch_application_reports(self.ms.default_account)
 
         headers = ["ID", "Scrip", "Name"]
 
@@ -269,30 +1412,21 @@ class AutomatedNepseUtils(Cmd):
         print("Usage: portfolio all")
 
     def do_portfolio(self, args):
-        portfolio: List[PortfolioEntry] = []
+        portfolio: "List[PortfolioEntry]" = []
 
         if args == "all":
-            for account in self.ms.accounts:
-                if len(account.portfolio.entries) == 0:
-                    account.fetch_portfolio()
-
-                for entry in account.portfolio.entries:
-                    found = False
-
-                    for combined_entry in portfolio:
-                        if combined_entry.script == entry.script:
-                            combined_entry.current_balance += entry.current_balance
-                            combined_entry.value_as_of_last_transaction_price += (
-                                entry.value_as_of_last_transaction_price
-                            )
-                            combined_entry.value_as_of_previous_closing_price += (
-                                entry.value_as_of_previous_closing_price
-                            )
-                            found = True
-                            break
-
-                    if not found:
-                        portfolio.append(PortfolioEntry.from_json(entry.to_json()))
+            accounts = self.selected_accounts()
+
+            # Fetch the portfolios that are not loaded yet side by side
+            missing = [account for account in accounts if len(account.portfolio.entries) == 0]
+            if missing:
+                with ThreadPoolExecutor(max_workers=max(1, self.sync_max_workers)) as executor:
+                    list(executor.map(self.fetch_portfolio, missing))
+
+            aggregator = PortfolioAggregator()
+            for account in accounts:
+                aggregator.add(account.portfolio.entries)
+            portfolio = aggregator.result()
 
         else:
             self.list_accounts()
@@ -301,7 +1435,7 @@ class AutomatedNepseUtils(Cmd):
             account = self.ms.accounts[int(account_id) - 1]
 
             if len(account.portfolio.entries) == 0:
-                account.fetch_portfolio()
+                self.fetch_portfolio(account)
 
             portfolio = account.portfolio.entries
 
@@ -382,23 +1516,150 @@ class AutomatedNepseUtils(Cmd):
             self.ms.tag_selections = args
             self.prompt = f"NepseUtils ({','.join(self.ms.tag_selections)}) > "
 
+    def help_priority(self):
+        print("Set the order accounts are applied for, synced and listed in")
+        print("Usage: priority {config | balance}")
+        print("balance puts the accounts with the largest saved portfolio first")
+
+    def do_priority(self, args):
+        if args not in ("config", "balance"):
+            print(f"Current priority: {self.account_priority}")
+            print('Incorrect format. Type "help priority" for help!')
+            return
+
+        self.account_priority = args
+        print(f"Accounts are now worked through in {args} order")
+
     def help_sync(self):
         print("Syncs unfetched portfolio and application status from MeroShare!")
+        print("Usage: sync")
+        print("Usage: sync full (re-fetch old applications and every pending status)")
+
+    def load_sync_state(self):
+        """Load the time each account was last synced"""
+        if os.path.exists(self.sync_state_file):
+            try:
+                with open(self.sync_state_file, 'r') as f:
+                    return json.load(f)
+            except json.JSONDecodeError:
+                print(f"Error reading {self.sync_state_file}, doing a full sync")
+        return {}
+
+    def save_sync_state(self, sync_state):
+        with open(self.sync_state_file, 'w') as f:
+            json.dump(sync_state, f, indent=4)
+
+    def sync_issues(self, account, full):
+        """Sync applied issues of an account and return how many statuses were fetched"""
+        if full:
+            self.sessions.call(account, "fetch_applied_issues")
+            pending = [issue for issue in account.issues if issue.alloted is None]
+            self.sessions.call(account, "fetch_applied_issues_status")
+            return len(pending)
+
+        # Old (migrated) applications were fetched by the first full sync and
+        # no longer change, so only recent applications are looked at here
+        issues = {issue.company_share_id: issue for issue in account.issues}
+        to_fetch = []
+
+        for report in self.fetch_application_reports(account, refresh=True):
+            issue = issues.get(report.get("companyShareId"))
+
+            if issue is None:
+                issue = Issue(
+                    name=report.get("companyName"),
+                    symbol=report.get("scrip"),
+                    status=report.get("statusName"),
+                    share_type=report.get("shareTypeName"),
+                    company_share_id=report.get("companyShareId"),
+                    applicant_form_id=report.get("applicantFormId"),
+                    old=False,
+                )
+                account.issues.append(issue)
+                to_fetch.append(issue)
+
+            elif issue.status != report.get("statusName"):
+                issue.status = report.get("statusName")
+                issue.alloted = None
+                to_fetch.append(issue)
+
+            elif issue.alloted is None:
+                # Result not out yet when last synced
+                to_fetch.append(issue)
+
+        for issue in to_fetch:
+            self.sessions.call(account, "fetch_applied_issues_status", company_id=issue.company_share_id)
+
+        return len(to_fetch)
 
     def do_sync(self, args):
-        for account in self.ms.accounts:
-            account.fetch_portfolio()
-            account.fetch_applied_issues()
-            account.fetch_applied_issues_status()
-            print(f"Synced {account.name}!")
+        accounts = self.selected_accounts()
+        if not accounts:
+            return
+
+        sync_state = self.load_sync_state()
+        full_sync = {
+            account: args == "full" or account.dmat not in sync_state
+            for account in accounts
+        }
+
+        # Portfolio and issues of every account are fetched side by side. Each
+        # worker logs its account in on first use; the session manager's
+        # per-account lock makes the two tasks of an account share one login
+        executor = ThreadPoolExecutor(max_workers=max(1, self.sync_max_workers))
+        futures = {}
+        for account in accounts:
+            futures[executor.submit(self.fetch_portfolio, account, True)] = (account, "portfolio")
+            futures[executor.submit(self.sync_issues, account, full_sync[account])] = (account, "issues")
+
+        remaining = {account: 2 for account in accounts}
+        fetched = {}
+        failed = {}
+
+        for future in as_completed(futures):
+            account, kind = futures[future]
+            try:
+                result = future.result()
+                if kind == "issues":
+                    fetched[account] = result
+            except Exception as e:
+                failed.setdefault(account, []).append(f"{kind}: {e}")
+
+            remaining[account] -= 1
+            if remaining[account]:
+                continue
+
+            if account in failed:
+                print(f"Failed to sync {account.name}! ({'; '.join(failed[account])})")
+            else:
+                sync_type = "full" if full_sync[account] else "incremental"
+                print(f"Synced {account.name}! ({sync_type}, {fetched[account]} statuses fetched)")
+                sync_state[account.dmat] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        executor.shutdown()
+        self.save_sync_state(sync_state)
 
     def help_stats(self):
         print("Shows statistics of accounts!")
-        print("Usage: stats")
+        print("Usage: stats [tag] [since YYYY-MM-DD] [until YYYY-MM-DD]")
+        print("tag: group the statistics by account tag instead of by account")
 
     def do_stats(self, args):
+        args = args.split()
+        by_tag = "tag" in args
+        since = args[args.index("since") + 1] if "since" in args[:-1] else None
+        until = args[args.index("until") + 1] if "until" in args[:-1] else None
+
+        accounts = self.selected_accounts()
+        totals = issue_totals(accounts, since, until, by_tag)
+
+        if by_tag:
+            names = {tag: tag for tag in totals}
+        else:
+            names = {index: account.name for index, account in enumerate(accounts)}
+
         headers = [
-            "Name",
+            "Tag" if by_tag else "Name",
             "Total Applied",
             "Total Rejected",
             "Total Allocations",
@@ -406,41 +1667,23 @@ class AutomatedNepseUtils(Cmd):
             "Total Amount Alloted",
             "% Alloted",
         ]
-        table = []
-
-        for account in self.ms.accounts:
-            account_applied = len(account.issues)
-            account_alloted = 0
-            account_rejected = 0
-            account_units_alloted = 0.0
-            account_amount_alloted = 0.0
-
-            for issue in account.issues:
-                if issue.alloted:
-                    account_alloted += 1
-                    account_units_alloted += issue.alloted_quantity or 0
-                    account_amount_alloted += issue.applied_amount or 0
-
-                if issue.status == "BLOCK_FAILED":
-                    account_rejected += 1
-
-            table.append(
-                [
-                    account.name,
-                    account_applied,
-                    account_rejected,
-                    account_alloted,
-                    account_units_alloted,
-                    account_amount_alloted,
-                    f"{account_alloted/account_applied*100:.2f}%",
-                ]
-            )
+        table = [
+            [
+                names[key],
+                applied,
+                rejected,
+                alloted,
+                units_alloted,
+                amount_alloted,
+                f"{alloted / applied * 100 if applied > 0 else 0.0:.2f}%",
+            ]
+            for key, (applied, rejected, alloted, units_alloted, amount_alloted) in totals.items()
+        ]
 
-        total_applied = sum([itm[1] for itm in table])
-        total_rejected = sum([itm[2] for itm in table])
-        total_alloted = sum([itm[3] for itm in table])
-        total_units_alloted = sum([itm[4] for itm in table])
-        total_amount_alloted = sum([itm[5] for itm in table])
+        column_totals = [sum(column) for column in zip(*totals.values())] or [0, 0, 0, 0.0, 0.0]
+        total_applied, total_rejected, total_alloted, total_units_alloted, total_amount_alloted = (
+            column_totals
+        )
         total_percent_alloted = (
             total_alloted / total_applied * 100 if total_applied > 0 else 0.0
         )
@@ -459,7 +1702,72 @@ class AutomatedNepseUtils(Cmd):
 
         print(tabulate(table, headers=headers, tablefmt="pretty"))
 
+    def fetch_issue_result(self, account, company_id):
+        self.sessions.call(account, "fetch_applied_issues_status", company_id=company_id)
+
+    def result_all_pending(self):
+        accounts = self.selected_accounts()
+
+        # Index every account's issues once instead of scanning per lookup
+        issue_indexes = {
+            account: {issue.company_share_id: issue for issue in account.issues}
+            for account in accounts
+        }
+
+        pending = {}
+        for account, index in issue_indexes.items():
+            for company_id, issue in index.items():
+                if issue.alloted is None:
+                    pending.setdefault(company_id, []).append(account)
+
+        if not pending:
+            print("No pending results!")
+            return
+
+        company_ids = sorted(pending)
+        failed = set()
+        with ThreadPoolExecutor(max_workers=max(1, self.sync_max_workers)) as executor:
+            futures = {
+                executor.submit(self.fetch_issue_result, account, company_id): (account, company_id)
+                for company_id in company_ids
+                for account in pending[company_id]
+            }
+            for future in as_completed(futures):
+                account, company_id = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning(f"Failed to fetch result of {company_id} for {account.name}: {e}")
+                    failed.add((account, company_id))
+
+        symbols = {}
+        for index in issue_indexes.values():
+            for company_id in company_ids:
+                if company_id in index:
+                    symbols.setdefault(company_id, index[company_id].symbol)
+
+        headers = ["Name"] + [symbols[company_id] for company_id in company_ids]
+        table = []
+        for account in accounts:
+            row = [account.name]
+            for company_id in company_ids:
+                issue = issue_indexes[account].get(company_id)
+                if not issue:
+                    row.append("N/A")
+                elif (account, company_id) in failed or issue.alloted is None:
+                    row.append("Pending")
+                elif issue.alloted:
+                    row.append(f"Yes ({issue.alloted_quantity})")
+                else:
+                    row.append("No")
+            table.append(row)
+        print(tabulate(table, headers=headers, tablefmt="pretty"))
+
     def do_result(self, args):
+        if args.strip() == "all-pending":
+            self.result_all_pending()
+            return
+
         if not args:
             self.do_list(args="results")
             company_id = input("Choose a company ID: ")
@@ -469,7 +1777,7 @@ class AutomatedNepseUtils(Cmd):
 
         headers = ["Name", "Alloted", "Quantity"]
         table = []
-        for account in self.ms.accounts:
+        for account in self.selected_accounts():
             issue_ins = None
             for issue in account.issues:
                 if issue.company_share_id == int(company_id):
@@ -481,7 +1789,7 @@ class AutomatedNepseUtils(Cmd):
                 continue
 
             if issue_ins.alloted == None:
-                account.fetch_applied_issues_status(company_id=company_id)
+                self.fetch_issue_result(account, issue_ins.company_share_id)
 
             table.append(
                 [
@@ -506,22 +1814,21 @@ class AutomatedNepseUtils(Cmd):
             print(f"Invalid tag {tag}. Setting to None")
 
         account.tag = tag
-        self.ms.save_data()
+        self._account_index = None
+        self.save_config()
 
     def help_tag(self):
         print("Tag an account to group them!")
 
     def help_result(self):
         print("Check results of IPO")
+        print("Usage: result [company ID | all-pending]")
+        print("all-pending checks every unpublished result for all accounts at once")
 
     def do_apply(self, args):
-        company_to_apply = None
-        quantity = None
+        quantity = self.apply_quantity
 
-        apply_headers = ["Name", "Quantity", "Applied", "Message"]
-        apply_table = []
-
-        appicable_issues = self.ms.default_account.fetch_applicable_issues()
+        appicable_issues = self.fetch_applicable_issues()
 
         headers = [
             "Share ID",
@@ -548,57 +1855,10 @@ class AutomatedNepseUtils(Cmd):
         
         # Display ordinary shares separately
         ordinary_shares = [
-            [
-                itm.get("companyShareId"),
-                itm.get("companyName"),
-                itm.get("scrip"),
-                itm.get("shareTypeName"),
-                itm.get("shareGroupName"),
-                itm.get("issueCloseDate"),
-            ]
-            for itm in appicable_issues if itm.get("shareGroupName") == "Ordinary Shares"
+            itm for itm in appicable_issues if itm.get("shareGroupName") == "Ordinary Shares"
         ]
         
-        if ordinary_shares:
-            print("\nOrdinary Shares Available:")
-            print(tabulate(ordinary_shares, headers=headers, tablefmt="pretty"))
-            
-            # Check if the first ordinary share has been previously applied
-            if ordinary_shares:
-                first_share_scrip = ordinary_shares[0][2]  # Scrip
-                first_share_close_date = ordinary_shares[0][5]  # Close date
-                
-                if self.is_share_previously_applied(first_share_scrip, first_share_close_date):
-                    print(f"\nShare {first_share_scrip} has already been applied for!")
-                    # Add to summary but don't show popup yet
-                    self.application_summary.append({
-                        "id": ordinary_shares[0][0],
-                        "name": ordinary_shares[0][1],
-                        "scrip": first_share_scrip,
-                        "type": ordinary_shares[0][3],
-                        "group": ordinary_shares[0][4],
-                        "close_date": first_share_close_date,
-                        "previously_applied": True,
-                        "results": []
-                    })
-                    
-                    # Check if there are more ordinary shares to apply for
-                    if len(ordinary_shares) > 1:
-                        # Move to the next share
-                        print("Moving to the next available share...")
-                        company_to_apply = str(ordinary_shares[1][0])
-                        print(f"Automatically selecting Share ID: {company_to_apply}")
-                    else:
-                        print("No more new shares to apply for.")
-                        # Show final summary popup and exit
-                        self.print_application_summary()
-                        self.final_popup_and_exit()
-                        return
-                else:
-                    # Automatically select the first ordinary share that hasn't been applied
-                    company_to_apply = str(ordinary_shares[0][0])  # First ordinary share ID
-                    print(f"Automatically selecting Share ID: {company_to_apply}")
-        else:
+        if not ordinary_shares:
             print("\nNo Ordinary Shares Available!")
             # Add this info to summary and show final popup
             self.application_summary.append({
@@ -608,99 +1868,254 @@ class AutomatedNepseUtils(Cmd):
             self.print_application_summary()
             self.final_popup_and_exit()
             return
-        
-        if not company_to_apply:
-            company_to_apply = input("Enter Share ID: ")
-        
-        quantity = "10"  # Always apply for 10 units
-        print(f"Units to Apply: {quantity}")
 
-        # Record share information for summary
-        share_info = None
-        for share in appicable_issues:
-            if str(share.get("companyShareId")) == company_to_apply:
-                share_info = {
+        print("\nOrdinary Shares Available:")
+        print(tabulate(
+            [row for row in table if row[4] == "Ordinary Shares"],
+            headers=headers,
+            tablefmt="pretty",
+        ))
+
+        # Skip shares that have already been applied for in an earlier run
+        shares_to_apply = []
+        for share in ordinary_shares:
+            if self.is_share_previously_applied(share.get("scrip"), share.get("issueCloseDate")):
+                print(f"\nShare {share.get('scrip')} has already been applied for!")
+                self.application_summary.append({
                     "id": share.get("companyShareId"),
                     "name": share.get("companyName"),
                     "scrip": share.get("scrip"),
                     "type": share.get("shareTypeName"),
                     "group": share.get("shareGroupName"),
                     "close_date": share.get("issueCloseDate"),
+                    "previously_applied": True,
                     "results": []
-                }
-                break
+                })
+            else:
+                shares_to_apply.append(share)
 
-        for account in self.ms.accounts:
-            if not company_to_apply:
-                appicable_issues = account.fetch_applicable_issues()
+        for share in shares_to_apply:
+            print(f"\nAutomatically selecting Share ID: {share.get('companyShareId')}")
+            self.apply_share(share, quantity)
 
-            try:
-                result = account.apply(
-                    share_id=int(company_to_apply), quantity=int(quantity)
-                )
-                application_status = result.get("status") == "CREATED"
-                application_message = result.get("message")
-            except Exception as e:
-                print(e)
-                print(f"Failed to apply for {account.name}!")
-                application_status = False
-                application_message = "Failed to apply!"
-                result = {"status": "FAILED", "message": application_message}
+        print("\nNo more ordinary shares to apply for.")
+        self.print_application_summary(show_popup=False)  # Just print to terminal
+        self.final_popup_and_exit()  # Show final popup and exit
 
-            try:
-                account.logout()
-            except:
-                print(f"Failed to logout for {account.name}!")
+    def apply_share(self, share, quantity, retry_later=False):
+        """Apply for a single applicable issue on all accounts and record the results.
+
+        With retry_later, a share every account failed to apply for is left
+        unrecorded so it can be tried again. Returns whether it was recorded.
+        """
+        if self.offline:
+            # The cached issue list may be stale, and offline mode must not
+            # touch MeroShare anyway
+            print(f"Offline mode: not applying for {share.get('scrip')}.")
+            return False
+
+        print(f"Units to Apply: {quantity}")
 
+        apply_headers = ["Name", "Quantity", "Applied", "Message"]
+        apply_table = []
+
+        # Record share information for summary
+        share_info = {
+            "id": share.get("companyShareId"),
+            "name": share.get("companyName"),
+            "scrip": share.get("scrip"),
+            "type": share.get("shareTypeName"),
+            "group": share.get("shareGroupName"),
+            "close_date": share.get("issueCloseDate"),
+            "results": []
+        }
+
+        results = self.apply_for_accounts(int(share_info["id"]), int(quantity))
+
+        for result in results:
             apply_table.append(
                 [
-                    account.name,
+                    result["account"],
                     quantity,
-                    application_status,
-                    application_message,
+                    result["applied"],
+                    result["message"],
                 ]
             )
-            
-            # Add to share info for summary
-            if share_info:
-                share_info["results"].append({
-                    "account": account.name,
-                    "applied": application_status,
-                    "message": application_message
-                })
+            share_info["results"].append(result)
 
         print(tabulate(apply_table, headers=apply_headers, tablefmt="pretty"))
-        
-        # Add to application summary
-        if share_info:
-            self.application_summary.append(share_info)
-            
-            # Save to previously applied shares
-            self.save_previously_applied_share(share_info)
-            
-        # Check if there are more ordinary shares to apply for
-        # If yes, exit to restart the process for the next share
-        remaining_ordinary_shares = [
-            share for share in appicable_issues 
-            if share.get("shareGroupName") == "Ordinary Shares" 
-            and str(share.get("companyShareId")) != company_to_apply
-            and not self.is_share_previously_applied(share.get("scrip"), share.get("issueCloseDate"))
+
+        self.application_summary.append(share_info)
+
+        # Applying changes what every account sees for both of these
+        self.cache.invalidate("applicable_issues", "application_reports")
+        self.coalescer.forget("applicable_issues")
+
+        if retry_later and results and not any(result["applied"] for result in results):
+            return False
+
+        self.save_previously_applied_share(share_info)
+        self.application_journal.finish(share_info["id"])
+        return True
+
+    def apply_for_account(self, account, share_id, quantity):
+        """Apply for a share on a single account"""
+        self.application_journal.record(share_id, account.dmat, "intent")
+        try:
+            result = self.sessions.call(account, "apply", share_id=share_id, quantity=quantity)
+            application_status = result.get("status") == "CREATED"
+            application_message = result.get("message")
+            retry = False
+            # Without an answer the application may or may not have gone
+            # through, so only an answered one is marked done
+            self.application_journal.record(share_id, account.dmat, "done", application_status)
+            if application_status:
+                self.applied_share_ids.setdefault(account, set()).add(share_id)
+        except Exception as e:
+            print(e)
+            print(f"Failed to apply for {account.name}!")
+            application_status = False
+            application_message = "Failed to apply!"
+            # Errors and timeouts of a busy MeroShare are worth another try,
+            # but an issue that isn't open to the account won't become so,
+            # and logging in again with credentials MeroShare turned down
+            # only adds failed logins
+            retry = not isinstance(e, GlobalError) and not self.sessions.login_failed(account)
+
+        if self.first_application_at is None:
+            self.first_application_at = time.monotonic()
+
+        return {
+            "account": account.name,
+            "applied": application_status,
+            "message": application_message,
+            "retry": retry,
+        }
+
+    def apply_for_accounts(self, share_id, quantity):
+        """Apply for a share on all selected accounts, returning results in priority order.
+
+        Accounts that have already applied are skipped. Accounts that failed
+        with an error are retried, and only those, after an exponential backoff.
+        """
+        accounts = self.selected_accounts()
+        if not accounts:
+            return []
+
+        results = {}
+        already_applied = self.already_applied(accounts, share_id)
+        for account in already_applied:
+            results[account] = {
+                "account": account.name,
+                "applied": True,
+                "message": "Issue already applied!",
+                "retry": False,
+            }
+
+        pending = [account for account in accounts if account not in already_applied]
+        for attempt in range(self.apply_retries + 1):
+            if not pending:
+                break
+            if attempt:
+                delay = self.request_controller.backoff(attempt)
+                print(f"Retrying {len(pending)} failed accounts in {delay:.1f}s...")
+                time.sleep(delay)
+
+            results.update(self.apply_round(pending, share_id, quantity))
+            pending = [account for account in pending if results[account]["retry"]]
+
+        for result in results.values():
+            del result["retry"]
+        return [results[account] for account in accounts]
+
+    def fetch_applied_share_ids(self, account):
+        try:
+            reports = self.fetch_application_reports(account, refresh=True)
+        except Exception as e:
+            logger.warning(f"Failed to fetch application reports of {account.name}: {e}")
+            return None
+        return {report.get("companyShareId") for report in reports}
+
+    def already_applied(self, accounts, share_id):
+        """Accounts that have applied for the share, going by the journal or their application reports"""
+        journal = self.application_journal
+        applied = {account for account in accounts if journal.applied(share_id, account.dmat)}
+
+        # Each account's applications are fetched once per run and kept up to
+        # date as it applies; an account whose reports can't be fetched is
+        # left to nepseutils' own check
+        unknown = [
+            account for account in accounts
+            if account not in applied and account not in self.applied_share_ids
         ]
-        
-        if remaining_ordinary_shares:
-            print("\nFound additional ordinary shares to apply for.")
-            print("Exiting to restart for next share application...")
-            self.print_application_summary(show_popup=False)  # Just print to terminal
-            time.sleep(2)
-            self.do_exit("")  # This will force the program to exit and restart
-        else:
-            print("\nNo more ordinary shares to apply for.")
-            self.print_application_summary(show_popup=False)  # Just print to terminal
-            self.final_popup_and_exit()  # Show final popup and exit
+        if unknown:
+            with ThreadPoolExecutor(max_workers=max(1, self.sync_max_workers)) as executor:
+                for account, share_ids in zip(unknown, executor.map(self.fetch_applied_share_ids, unknown)):
+                    if share_ids is not None:
+                        self.applied_share_ids[account] = share_ids
+
+        applied.update(
+            account for account in accounts
+            if share_id in self.applied_share_ids.get(account, ())
+        )
+        return applied
+
+    def apply_round(self, accounts, share_id, quantity):
+        """Apply for a share on the given accounts, as many at a time as the controller allows"""
+        controller = self.request_controller
+        started_at = {}
+        leases = {}
+
+        def apply(account):
+            leases[account] = controller.acquire()
+            started_at[account] = time.monotonic()
+            result = None
+            try:
+                result = self.apply_for_account(account, share_id, quantity)
+                return result
+            finally:
+                controller.release(leases[account], result is not None and not result["retry"])
+
+        # The controller decides how many accounts apply at once, up to the
+        # pool's size; http_timeout keeps a hung request from holding a
+        # worker for long after its account timed out
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(accounts), self.apply_max_workers)))
+        futures = {executor.submit(apply, account): account for account in accounts}
+
+        # An account's timeout counts from when it actually started, since it
+        # may wait for the controller first
+        results = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+
+            now = time.monotonic()
+            for future in list(pending):
+                account = futures[future]
+                if account in started_at and now - started_at[account] > self.apply_timeout:
+                    print(f"Timed out applying for {account.name}!")
+                    # Free the slot for the next account now
+                    controller.release(leases[account], False)
+                    # Still running, so retrying it could apply twice
+                    results[account] = {
+                        "account": account.name,
+                        "applied": False,
+                        "message": "Timed out!",
+                        "retry": False,
+                    }
+                    pending.discard(future)
+
+        executor.shutdown(wait=False, cancel_futures=True)
+        return results
 
     def show_popup_message(self, title, message):
         """Show a popup message window"""
         try:
+            import tkinter as tk
+            from tkinter import messagebox
+
             # Create a hidden root window
             root = tk.Tk()
             root.withdraw()  # Hide the main window
@@ -714,6 +2129,21 @@ class AutomatedNepseUtils(Cmd):
             print(f"Failed to show popup: {e}")
             print(f"Popup message: {title} - {message}")
 
+    def queue_popup_message(self, title, message):
+        """Show a popup message window without waiting for it to be closed"""
+        # Tk isn't safe to use from several threads, so every queued popup is
+        # shown in turn by one thread
+        if self.popups is None:
+            self.popups = queue.Queue()
+
+            def show_popups():
+                while True:
+                    self.show_popup_message(*self.popups.get())
+
+            threading.Thread(target=show_popups, daemon=True).start()
+
+        self.popups.put((title, message))
+
     def generate_summary_message(self):
         """Generate a formatted summary message for the popup"""
         if not self.application_summary:
@@ -795,8 +2225,23 @@ class AutomatedNepseUtils(Cmd):
     def final_popup_and_exit(self):
         """Display a final popup with complete summary and exit the program"""
         summary_message = self.generate_summary_message()
-        
+        self.previously_applied.flush()
+        self.saver.flush()
+        self.sessions.close()
+        self.call_log.close()
+
+        if self.first_application_at is not None:
+            time_to_first_application = self.first_application_at - STARTED_AT
+            print(f"Time to first application: {time_to_first_application:.2f}s")
+            logger.info(f"Time to first application: {time_to_first_application:.2f}s")
+
+        if not self.exit_after_apply:
+            return
+
         try:
+            import tkinter as tk
+            from tkinter import messagebox
+
             # Create a hidden root window
             root = tk.Tk()
             root.withdraw()  # Hide the main window
@@ -811,62 +2256,185 @@ class AutomatedNepseUtils(Cmd):
             print(f"Final popup message: {summary_message}")
         
         print("All processing complete. Exiting...")
+        # os._exit skips atexit handlers, so flush the log first
+        cleanup()
         # Force exit to ensure the program closes
         os._exit(0)
 
+    def is_new_ordinary_share(self, share):
+        """Check if an applicable issue is an ordinary share not applied for yet"""
+        return (
+            share.get("shareGroupName") == "Ordinary Shares"
+            and not self.is_share_previously_applied(share.get("scrip"), share.get("issueCloseDate"))
+        )
+
+    def poll_delay(self, failures):
+        """Seconds until the next poll, backing off after failures and adding jitter"""
+        delay = min(self.poll_interval * 2 ** failures, self.poll_max_backoff)
+        return delay * random.uniform(1 - self.poll_jitter, 1 + self.poll_jitter)
+
+    def poll_applicable_issues(self):
+        """Fetch applicable issues for the default account with a single request.
+
+        Polls skip the response cache and don't rewrite the config, since
+        their answer is only compared with the previous one.
+        """
+        account = self.ms.default_account
+        save = account.save
+        # nepseutils saves the whole config after every fetch, but polling
+        # doesn't change anything worth saving
+        account.save = lambda: None
+        try:
+            try:
+                return self.sessions.call(account, "fetch_applicable_issues")
+            except LocalException:
+                # Usually a session MeroShare has expired; call() dropped it,
+                # so this logs in again
+                return self.sessions.call(account, "fetch_applicable_issues")
+        finally:
+            account.save = save
+
+    def run_daemon(self, password):
+        """Keep polling for new ordinary shares and apply as soon as one opens"""
+        self.load_config(password)
+        print(f"Polling for new ordinary shares every {self.poll_interval:.0f}s...")
+
+        # A service manager stops the daemon with SIGTERM (SIGBREAK on Windows)
+        if threading.current_thread() is threading.main_thread():
+            for name in ("SIGTERM", "SIGBREAK"):
+                if hasattr(signal, name):
+                    signal.signal(getattr(signal, name), lambda signum, frame: self.stop_event.set())
+
+        # Sessions are only renewed once MeroShare rejects them, so an idle
+        # poll doesn't log out and back in
+        self.sessions.ttl = math.inf
+
+        watcher = IssueWatcher()
+        failures = 0
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    appicable_issues = self.poll_applicable_issues()
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    print(f"Failed to fetch applicable issues ({failures} in a row): {e}")
+                    self.stop_event.wait(self.poll_delay(failures))
+                    continue
+
+                # Only an issue that wasn't listed last time can need applying
+                new_shares = [
+                    share for share in watcher.new_issues(appicable_issues)
+                    if self.is_new_ordinary_share(share)
+                ]
+
+                if new_shares:
+                    self.application_summary = []
+                    for share in new_shares:
+                        print(f"\nNew ordinary share found: {share.get('scrip')}")
+                        try:
+                            recorded = self.apply_share(share, self.apply_quantity, retry_later=True)
+                        except Exception as e:
+                            recorded = False
+                            logger.exception(f"Failed to apply for {share.get('scrip')}")
+                            print(f"Failed to apply for {share.get('scrip')}: {e}")
+
+                        if not recorded:
+                            # Try the share again on the next poll instead of dropping it
+                            print(f"No account applied for {share.get('scrip')}, retrying on the next poll")
+                            watcher.forget(share.get("companyShareId"))
+
+                    self.previously_applied.flush()
+                    self.print_application_summary(show_popup=False)
+                    # Don't hold up the next poll until the popup is closed
+                    self.queue_popup_message("Application Summary", self.generate_summary_message())
+
+                self.stop_event.wait(self.poll_delay(0))
+
+            print("Stopping daemon...")
+        except KeyboardInterrupt:
+            print("Stopping daemon...")
+
+        self.do_exit("")
+
     def do_automated_apply(self, args):
         """Automatically run the apply command"""
-        time.sleep(1)  # Wait for the prompt
         print("Automatically running apply command...")
         self.do_apply("")
 
     def help_apply(self):
         print("Apply for shares")
 
-    def do_status(self, args):
-        company_share_id = None
-        status_headers = ["Name", "Status", "Detail"]
-        status_table = []
-        for account in self.ms.accounts:
-            reports = account.fetch_application_reports()
-
-            if not company_share_id:
-                headers = ["Share ID", "Company Name", "Scrip"]
-                table = [
-                    [
-                        itm.get("companyShareId"),
-                        itm.get("companyName"),
-                        itm.get("scrip"),
-                    ]
-                    for itm in reports
-                ]
-                print(tabulate(table[::-1], headers=headers, tablefmt="pretty"))
-
-                company_share_id = input("Enter Share ID: ")
+    def help_status(self):
+        print("Check application status of IPOs for all accounts")
+        print("Usage: status")
+        print("Usage: status {share_id} [share_id ...]")
+
+    def fetch_form_index(self, account):
+        """Map companyShareId to applicantFormId for an account's applications"""
+        return {
+            report.get("companyShareId"): report.get("applicantFormId")
+            for report in self.fetch_application_reports(account)
+            if report.get("applicantFormId")
+        }
 
-            form_id = None
-            for forms in reports:
-                if forms.get("companyShareId") == int(company_share_id) and forms.get(
-                    "applicantFormId"
-                ):
-                    form_id = forms.get("applicantFormId")
-                    break
+    def fetch_form_status(self, account, form_id):
+        try:
+            return self.sessions.call(account, "fetch_application_status", form_id=form_id)
+        except LocalException:
+            return None
 
-            try:
-                detailed_form = account.fetch_application_status(form_id=form_id)
-            except LocalException as e:
-                account.logout()
-                status_table.append([account.name, "N/A", "N/A"])
-                continue
+    def do_status(self, args):
+        share_ids = [int(share_id) for share_id in args.replace(",", " ").split()]
 
-            account.logout()
-            status_table.append(
+        if not share_ids:
+            reports = self.fetch_application_reports(self.ms.default_account)
+            headers = ["Share ID", "Company Name", "Scrip"]
+            table = [
                 [
-                    account.name,
-                    detailed_form.get("statusName"),
-                    detailed_form.get("reasonOrRemark"),
+                    itm.get("companyShareId"),
+                    itm.get("companyName"),
+                    itm.get("scrip"),
                 ]
-            )
+                for itm in reports
+            ]
+            print(tabulate(table[::-1], headers=headers, tablefmt="pretty"))
+
+            share_ids = [int(share_id) for share_id in input("Enter Share ID: ").replace(",", " ").split()]
+
+        accounts = self.selected_accounts()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.sync_max_workers)) as executor:
+            form_indexes = dict(zip(accounts, executor.map(self.fetch_form_index, accounts)))
+
+            # Only forms that exist are fetched; the rest show as N/A
+            forms = {
+                (account, share_id): executor.submit(self.fetch_form_status, account, form_indexes[account][share_id])
+                for account in accounts
+                for share_id in share_ids
+                if share_id in form_indexes[account]
+            }
+
+            status_headers = ["Name", "Status", "Detail"]
+            if len(share_ids) > 1:
+                status_headers.insert(1, "Share ID")
+
+            status_table = []
+            for share_id in share_ids:
+                for account in accounts:
+                    form = forms.get((account, share_id))
+                    detailed_form = form.result() if form else None
+
+                    row = [account.name, "N/A", "N/A"]
+                    if detailed_form:
+                        row = [
+                            account.name,
+                            detailed_form.get("statusName"),
+                            detailed_form.get("reasonOrRemark"),
+                        ]
+                    if len(share_ids) > 1:
+                        row.insert(1, share_id)
+                    status_table.append(row)
 
         print(tabulate(status_table, headers=status_headers, tablefmt="pretty"))
 
@@ -875,8 +2443,12 @@ class AutomatedNepseUtils(Cmd):
 
         if args[0] == "lock":
             password = getpass(prompt="Enter new password for NepseUtils: ")
+            # The agent's copy is locked with the old password
+            agent_request(self.agent_file, self._agent_password, ("forget", str(self.config_path)))
+            self._agent_password = password
             self.ms.fernet = self.ms.fernet_init(password)
-            self.ms.save_data()
+            self.save_config()
+            self.saver.flush()
             print("Password changed successfully!")
             exit(0)
 
@@ -895,7 +2467,7 @@ class AutomatedNepseUtils(Cmd):
                 return
 
             self.ms.accounts[int(account_id) - 1].password = new_password
-            self.ms.save_data()
+            self.save_config()
 
     def help_loglevel(self):
         print("Set logging level")
@@ -915,7 +2487,8 @@ class AutomatedNepseUtils(Cmd):
         else:
             print("Invalid argument!")
 
-        self.ms.save_data()
+        self.save_config()
+        self.saver.flush()
         print(f"Logging level set to {args}! Restart NepseUtils!")
         exit()
 
@@ -924,6 +2497,14 @@ class AutomatedNepseUtils(Cmd):
         print("lock: Change nepseutils password")
 
     def do_exit(self, *args):
+        if self._previously_applied is not None:
+            self.previously_applied.flush()
+        if self.saver is not None:
+            self.saver.flush()
+        if self._sessions is not None:
+            self.sessions.close()
+        if self._call_log is not None:
+            self.call_log.close()
         print("Bye")
         return True
 
@@ -948,12 +2529,12 @@ class AutomatedNepseUtils(Cmd):
 
             self.ms.telegram_bot_token = token
             self.ms.telegram_chat_id = chat_id
-            self.ms.save_data()
+            self.save_config()
 
         elif args == "disable":
             self.ms.telegram_bot_token = None
             self.ms.telegram_chat_id = None
-            self.ms.save_data()
+            self.save_config()
 
         else:
             print("Invalid argument!")
@@ -967,6 +2548,59 @@ class AutomatedNepseUtils(Cmd):
 
         print('Invalid command! Type "help" for help')
 
+    def help_report(self):
+        print("Show latency of MeroShare calls recorded by past runs")
+        print("Usage: report [last] [account {account name}]")
+        print("last: only the most recent run")
+
+    def do_report(self, args):
+        args = args.split()
+        events = CallRecorder.load_events(self.call_log_file)
+
+        if "last" in args and events:
+            last_run = max(event["run"] for event in events)
+            events = [event for event in events if event["run"] == last_run]
+
+        if "account" in args:
+            account_name = " ".join(args[args.index("account") + 1:])
+            events = [event for event in events if event["account"] == account_name]
+
+        if not events:
+            print("No recorded calls found!")
+            return
+
+        durations = {}
+        errors = {}
+        retries = {}
+        for event in events:
+            endpoint = event["endpoint"]
+            durations.setdefault(endpoint, []).append(event["duration_ms"])
+            errors[endpoint] = errors.get(endpoint, 0) + (event["status"] != "ok")
+            retries[endpoint] = retries.get(endpoint, 0) + event["retries"]
+
+        def percentile(values, percent):
+            # Nearest-rank percentile of already sorted values
+            return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+        headers = ["Endpoint", "Calls", "Errors", "Retries", "p50 (ms)", "p95 (ms)"]
+        table = []
+        for endpoint, values in sorted(durations.items()):
+            values.sort()
+            table.append(
+                [
+                    endpoint,
+                    len(values),
+                    errors[endpoint],
+                    retries[endpoint],
+                    f"{percentile(values, 50):,.1f}",
+                    f"{percentile(values, 95):,.1f}",
+                ]
+            )
+
+        runs = len({event["run"] for event in events})
+        print(f"Calls recorded over {runs} run(s)")
+        print(tabulate(table, headers=headers, tablefmt="pretty"))
+
     def help_previously_applied(self):
         print("List previously applied shares")
         print("Usage: previously_applied")
@@ -1000,11 +2634,10 @@ class AutomatedNepseUtils(Cmd):
 
     def do_clear_previously_applied(self, args):
         """Clear the list of previously applied shares"""
-        if os.path.exists(self.previously_applied_file):
+        if self.previously_applied.records or os.path.exists(self.previously_applied_file):
             confirm = input("Are you sure you want to clear all previously applied share records? (y/n): ")
             if confirm.lower() == "y":
-                with open(self.previously_applied_file, 'w') as f:
-                    json.dump([], f)
+                self.previously_applied.clear()
                 print("Previously applied shares list cleared!")
             else:
                 print("Operation cancelled.")
@@ -1012,25 +2645,297 @@ class AutomatedNepseUtils(Cmd):
             print("No previously applied shares file found!")
 
 
+def setup_logging(log_filename=None):
+    """Send logging and console output to the application log file through one background writer"""
+    global log_handler, log_listener
+
+    log_filename = log_filename or os.path.join(BASE_DIR, 'nepse_application.log')
+
+    # Every run starts a fresh log; earlier runs are kept as .1, .2, ...
+    file_handler = RotatingFileHandler(log_filename, maxBytes=LOG_MAX_BYTES,
+                                       backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    if os.path.getsize(log_filename) > 0:
+        try:
+            file_handler.doRollover()
+        except OSError as e:
+            # Another process still has the log open (Windows can't rename
+            # it then); keep appending to it rather than failing the run
+            print(f"Could not start a new log file: {e}")
+            if file_handler.stream is None:
+                file_handler.stream = file_handler._open()
+    file_handler.setFormatter(LogFormatter('%(asctime)s - %(message)s',
+                                           datefmt='%m/%d/%Y %I:%M:%S %p'))  # Month/Day/Year 12-hour format with AM/PM
+
+    log_handler = BlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    log_listener = QueueListener(log_handler.queue, file_handler)
+    log_listener.start()
+
+    logging.getLogger().setLevel(logging.INFO)
+    attach_log_handler()
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+
+    # MeroShare resets the root logger to the config's level (ERROR by
+    # default), so this script's own records get a logger of their own
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(log_handler)
+
+    # Console output goes to the same log, without timestamps
+    console_logger = logging.getLogger(CONSOLE_LOGGER)
+    console_logger.setLevel(logging.INFO)
+    console_logger.propagate = False
+    console_logger.addHandler(log_handler)
+
+    sys.stdout = TeeLogger(console_logger, sys.stdout)
+    sys.stderr = TeeLogger(console_logger, sys.stderr)
+
+
+def attach_log_handler():
+    """(Re)attach the application log to the root logger.
+
+    MeroShare reconfigures logging with force=True when it is created, which
+    drops every handler already on the root logger.
+    """
+    root_logger = logging.getLogger()
+    if log_handler is not None and log_handler not in root_logger.handlers:
+        root_logger.addHandler(log_handler)
+
+
+def shutdown_logging():
+    """Write out everything still queued and close the log file"""
+    global log_handler, log_listener
+
+    for stream in (sys.stdout, sys.stderr):
+        if isinstance(stream, TeeLogger):
+            stream.close()
+
+    # A reused profile worker sets logging up again for its next profile,
+    # which must not leave records on this run's queue
+    if log_handler is not None:
+        for name in (APP_LOGGER, CONSOLE_LOGGER, None):
+            logging.getLogger(name).removeHandler(log_handler)
+        log_handler = None
+
+    if log_listener is not None:
+        log_listener.stop()
+        for handler in log_listener.handlers:
+            handler.close()
+        log_listener = None
+
+
+def load_profiles(filename):
+    """Read the profiles file: a JSON list of {"name", "config", "password"} entries.
+
+    Profiles without a password are asked for one up front, since the worker
+    processes cannot prompt.
+    """
+    with open(filename, "r") as f:
+        profiles = json.load(f)
+
+    # The name picks the profile's state directory, so it has to be given
+    # (nepseutils configs are all called config.json) and unique
+    names = [profile.get("name") for profile in profiles]
+    if not all(names):
+        raise ValueError("Every profile needs a name")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Profile names must be unique: {', '.join(duplicates)}")
+
+    for profile in profiles:
+        if not profile.get("password"):
+            profile["password"] = getpass(prompt=f"Enter password for profile {profile['name']}: ")
+
+    return profiles
+
+
+def run_profile(profile, options):
+    """Run the apply pipeline of one profile in a worker process and report its outcome"""
+    # Every profile keeps its own journal, cache and log so profiles never
+    # skip each other's shares or write to the same files
+    state_dir = profile.get("state_dir") or os.path.join(BASE_DIR, "profiles", profile["name"])
+    os.makedirs(state_dir, exist_ok=True)
+
+    # Console output of a worker only goes to its own log
+    stdout, stderr = sys.stdout, sys.stderr
+    devnull = open(os.devnull, "w")
+    sys.stdout = sys.stderr = devnull
+    setup_logging(os.path.join(state_dir, "nepse_application.log"))
+
+    cli = AutomatedNepseUtils()
+    for attr, value in options.items():
+        setattr(cli, attr, value)
+    for attr in ("previously_applied_file", "legacy_previously_applied_file", "sync_state_file",
+                 "cache_file", "call_log_file", "application_journal_file"):
+        setattr(cli, attr, os.path.join(state_dir, os.path.basename(getattr(cli, attr))))
+    cli.exit_after_apply = False
+    # Worker processes are reused, so don't share the class-level list
+    cli.application_summary = []
+
+    result = {"name": profile["name"], "summary": [], "error": None}
+    try:
+        cli.auto(profile["password"], profile["config"])
+    except SystemExit:
+        # load_config exits on a wrong password
+        result["error"] = "Could not unlock the config"
+    except Exception as e:
+        logger.exception(f"Profile {profile['name']} failed")
+        result["error"] = str(e)
+
+    result["summary"] = cli.application_summary
+    if result["error"]:
+        result["exit_status"] = 2
+    elif any(not r["applied"] for share in cli.application_summary for r in share.get("results", [])):
+        result["exit_status"] = 1
+    else:
+        result["exit_status"] = 0
+
+    cleanup()
+    sys.stdout, sys.stderr = stdout, stderr
+    devnull.close()
+    return result
+
+
+def run_profiles(profiles_file, options, max_workers=None):
+    """Apply for every profile in its own process and print one summary.
+
+    Returns the worst exit status: 0 if everything applied, 1 if some
+    applications failed and 2 if a profile could not be run at all.
+    """
+    try:
+        profiles = load_profiles(profiles_file)
+    except ValueError as e:
+        print(f"Invalid profiles file: {e}")
+        return 2
+    if not profiles:
+        print("No profiles to run!")
+        return 0
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(profiles)))
+    print(f"Running {len(profiles)} profiles, {max_workers} at a time...")
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # spawn gives every worker a fresh interpreter instead of a copy of this
+    # process' logging threads, and matches how Windows starts processes
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {executor.submit(run_profile, profile, options): profile["name"] for profile in profiles}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = {"name": name, "summary": [], "error": str(e), "exit_status": 2}
+            print(f"Profile {name} finished with exit status {results[name]['exit_status']}")
+
+    headers = ["Profile", "Share", "Applied", "Failed", "Exit Status"]
+    table = []
+    for profile in profiles:
+        result = results[profile["name"]]
+        if result["error"]:
+            table.append([result["name"], f"Error: {result['error']}", "", "", result["exit_status"]])
+            continue
+
+        shares = [share for share in result["summary"] if "scrip" in share]
+        if not shares:
+            table.append([result["name"], "No new shares", "", "", result["exit_status"]])
+        for share in shares:
+            if share.get("previously_applied"):
+                table.append([result["name"], share["scrip"], "Previously applied", "", result["exit_status"]])
+                continue
+            applied = sum(1 for r in share["results"] if r["applied"])
+            table.append([result["name"], share["scrip"], applied, len(share["results"]) - applied,
+                          result["exit_status"]])
+
+    print("\n=== PROFILES SUMMARY ===")
+    print(tabulate(table, headers=headers, tablefmt="pretty"))
+
+    return max(result["exit_status"] for result in results.values())
+
+
 def main():
     parser = argparse.ArgumentParser(description="Nepse Utility CLI")
 
     parser.add_argument("--password", help="Password for auto_apply")
     parser.add_argument("--auto", action="store_true", help="Enable auto_apply mode")
+    parser.add_argument("--headless", action="store_true",
+                        help="Apply for new shares without the interactive prompt (used by the AutoIt launcher)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and apply as soon as a new ordinary share opens")
+    parser.add_argument("--poll-interval", type=float, default=AutomatedNepseUtils.poll_interval,
+                        help="Seconds between checks for new shares in daemon mode")
+    parser.add_argument("--workers", type=int, default=AutomatedNepseUtils.apply_max_workers,
+                        help="Maximum number of accounts to apply for at the same time")
+    parser.add_argument("--apply-timeout", type=float, default=AutomatedNepseUtils.apply_timeout,
+                        help="Seconds to wait for a single account's application")
+    parser.add_argument("--apply-retries", type=int, default=AutomatedNepseUtils.apply_retries,
+                        help="Extra rounds for accounts whose application failed with an error")
+    parser.add_argument("--session-ttl", type=float, default=AutomatedNepseUtils.session_ttl,
+                        help="Seconds to reuse an account's login before logging in again (not used by --daemon)")
+    parser.add_argument("--sync-workers", type=int, default=AutomatedNepseUtils.sync_max_workers,
+                        help="Maximum number of fetches running at the same time during sync")
+    parser.add_argument("--pool-size", type=int, default=AutomatedNepseUtils.http_pool_size,
+                        help="Number of keep-alive HTTP connections shared by all accounts")
+    parser.add_argument("--priority", choices=("config", "balance"), default=AutomatedNepseUtils.account_priority,
+                        help="Order to apply for accounts in; balance puts the largest portfolios first")
+    parser.add_argument("--offline", action="store_true",
+                        help="Skip the automatic apply and serve portfolio, stats and previously_applied from cache")
+    parser.add_argument("--profiles",
+                        help="JSON file listing several configs to apply for, each in its own process")
+    parser.add_argument("--profile-workers", type=int,
+                        help="Maximum number of profiles running at the same time (default: CPU count)")
+    parser.add_argument("--agent", action="store_true",
+                        help="Run a local credential agent that keeps decrypted configs so later runs start faster")
+    parser.add_argument("--agent-idle-timeout", type=float, default=AutomatedNepseUtils.agent_idle_timeout,
+                        help="Seconds without a request before the credential agent exits")
 
     args = parser.parse_args()
-
-    if args.auto and args.password:
-        AutomatedNepseUtils().auto(args.password)
+    if args.offline and (args.auto or args.headless or args.daemon or args.profiles):
+        parser.error("--offline can't be combined with --auto, --headless, --daemon or --profiles, which apply")
+
+    # The agent runs for hours; holding the application log open would stop
+    # every later run from rolling it over on Windows
+    if not args.agent:
+        setup_logging()
+
+    cli = AutomatedNepseUtils()
+    cli.apply_max_workers = args.workers
+    cli.apply_timeout = args.apply_timeout
+    cli.apply_retries = args.apply_retries
+    cli.session_ttl = args.session_ttl
+    cli.sync_max_workers = args.sync_workers
+    cli.http_pool_size = args.pool_size
+    cli.offline = args.offline
+    cli.account_priority = args.priority
+    cli.poll_interval = args.poll_interval
+
+    if args.agent:
+        agent = CredentialAgent(cli.agent_file, args.password or cli.password, args.agent_idle_timeout)
+        agent.serve()
+    elif args.profiles:
+        options = {
+            "apply_max_workers": args.workers,
+            "apply_timeout": args.apply_timeout,
+            "apply_retries": args.apply_retries,
+            "session_ttl": args.session_ttl,
+            "sync_max_workers": args.sync_workers,
+            "http_pool_size": args.pool_size,
+            "account_priority": args.priority,
+        }
+        sys.exit(run_profiles(args.profiles, options, args.profile_workers))
+    elif args.daemon:
+        cli.run_daemon(args.password or cli.password)
+    elif args.headless:
+        cli.auto(args.password or cli.password)
+    elif args.auto and args.password:
+        cli.auto(args.password)
     else:
-        AutomatedNepseUtils().cmdloop()
+        cli.cmdloop()
 
-# Add this after defining the TeeLogger class
 def cleanup():
-    if hasattr(sys.stdout, 'close') and not isinstance(sys.stdout, type(sys.__stdout__)):
-        sys.stdout.close()
-    if hasattr(sys.stderr, 'close') and not isinstance(sys.stderr, type(sys.__stderr__)):
-        sys.stderr.close()
+    shutdown_logging()
 
 
 atexit.register(cleanup)